@@ -0,0 +1,268 @@
+"""
+Endpoint benchmark harness.
+
+Boots the FastAPI app in-process against the database given by DATABASE_URL
+(a throwaway SQLite file by default), seeds it, then drives the hot endpoints
+concurrently through an ASGI transport and reports latency percentiles and
+throughput as JSON.
+
+    python benchmarks/bench_endpoints.py --riders 5000 --feedbacks 20000 -o bench.json
+    python benchmarks/bench_endpoints.py -o new.json --compare bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ["login", "riders", "feedbacks", "register_rider"]
+REGIONS = ["Westlands", "Embakasi", "Kasarani", "Lang'ata", "Dagoretti",
+           "Starehe", "Kamukunji", "Makadara", "Ruaraka", "Mathare"]
+BENCH_PASSWORD = "bench-password"
+PDF_BYTES = b"%PDF-1.4\n%bench\n" + b"0" * 2048 + b"\n%%EOF\n"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Dropu API endpoints in-process.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="Database to benchmark against (default: temporary SQLite file)")
+    parser.add_argument("--admins", type=int, default=50)
+    parser.add_argument("--riders", type=int, default=5000)
+    parser.add_argument("--feedbacks", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(db, admins, riders, feedbacks):
+    """Bulk-load admins, riders and feedback sharing one precomputed password hash."""
+    from models import Admin, Rider, Feedback
+    from utils.security import hash_password
+
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow()
+
+    db.bulk_insert_mappings(Admin, [
+        {
+            "name": f"Bench Admin {i}",
+            "email": f"admin{i}@dropu-bench.co.ke",
+            "password": password_hash,
+            "preferences": {"theme": "light", "notifications": True},
+            "role": "super_admin" if i == 0 else "admin",
+        }
+        for i in range(max(admins, 1))
+    ])
+    db.commit()
+
+    for start in range(0, riders, 5000):
+        db.bulk_insert_mappings(Rider, [
+            {
+                "name": f"Rider{i} Bench{i % 97}",
+                "email": f"rider{i}@dropu-bench.co.ke",
+                "password": password_hash,
+                "bike_number": f"KMB{i:07d}",
+                "phone_number": f"07{i % 100000000:08d}",
+                "bike_model": "Boxer BM150",
+                "bike_color": "Red",
+                "license": f"DL{i:08d}",
+                "id_document": f"/static/uploads/riders/rider-{i}-id_document-0.pdf",
+                "driving_license": f"/static/uploads/riders/rider-{i}-driving_license-0.pdf",
+                "insurance": f"/static/uploads/riders/rider-{i}-insurance-0.pdf",
+                "emergency_contact_name": f"Contact {i}",
+                "emergency_contact_phone": f"07{(i * 7) % 100000000:08d}",
+                "emergency_contact_relationship": "Sibling",
+                "created_by": 1,
+                "status": "active",
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(start, min(start + 5000, riders))
+        ])
+        db.commit()
+
+    for start in range(0, feedbacks, 5000):
+        db.bulk_insert_mappings(Feedback, [
+            {
+                "user_id": 1 + i % max(admins, 1),
+                "user_type": "admin",
+                "message": f"Delivery {i} arrived late near {REGIONS[i % len(REGIONS)]} stage",
+                "region": REGIONS[i % len(REGIONS)],
+                "category": "General",
+                "status": "Pending",
+                "rating": i % 6,
+                "timestamp": now - timedelta(minutes=i),
+            }
+            for i in range(start, min(start + 5000, feedbacks))
+        ])
+        db.commit()
+
+
+def build_scenarios():
+    """Map endpoint names to coroutine factories taking (client, sequence number)."""
+    admin_cookie = {"session": "1|super_admin"}
+
+    async def login(client, n):
+        return await client.post("/auth/login", json={
+            "email": f"admin{n % 10}@dropu-bench.co.ke", "password": BENCH_PASSWORD})
+
+    async def riders(client, n):
+        return await client.get("/admin/riders", params={"skip": (n * 10) % 1000, "limit": 100},
+                                cookies=admin_cookie)
+
+    async def feedbacks(client, n):
+        return await client.get("/admin/feedbacks", params={"region": REGIONS[n % len(REGIONS)]},
+                                cookies=admin_cookie)
+
+    async def register_rider(client, n):
+        token = f"{os.getpid()}-{n}-{time.perf_counter_ns()}"
+        pdf = ("doc.pdf", PDF_BYTES, "application/pdf")
+        return await client.post("/admin/register-rider", cookies=admin_cookie, data={
+            "first_name": "Bench", "last_name": f"Rider{n}", "phone_number": "0700000000",
+            "email": f"new{token}@dropu-bench.co.ke", "bike_model": "Boxer", "bike_color": "Blue",
+            "plate_number": f"KB{token}", "license": f"L{token}",
+            "emergency_contact_name": "Contact", "emergency_contact_phone": "0711111111",
+            "emergency_contact_relationship": "Parent", "terms_accepted": "true",
+        }, files={"id_document": pdf, "driving_license": pdf, "insurance": pdf})
+
+    return {"login": login, "riders": riders, "feedbacks": feedbacks, "register_rider": register_rider}
+
+
+async def drive(client, scenario, total, concurrency, offset=0):
+    """Issue `total` requests with at most `concurrency` in flight; return latencies and errors."""
+    latencies = []
+    errors = 0
+    counter = iter(range(offset, offset + total))
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            started = time.perf_counter()
+            response = await scenario(client, n)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(app, args):
+    import httpx
+
+    scenarios = build_scenarios()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in args.endpoints:
+            await drive(client, scenarios[name], args.warmup, args.concurrency, offset=10**6)
+            latencies, errors, elapsed = await drive(client, scenarios[name], args.requests, args.concurrency)
+            latencies.sort()
+            results[name] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+                "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+            }
+    return results
+
+
+def compare(current, previous):
+    """Print per-endpoint percentage deltas against a previous report to stderr."""
+    for name, stats in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            if old.get(key):
+                deltas.append(f"{key} {100 * (stats[key] - old[key]) / old[key]:+.1f}%")
+        print(f"{name}: " + ", ".join(deltas), file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Resolve report paths before moving into the scratch directory
+    args.output = os.path.abspath(args.output) if args.output else None
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+    workdir = tempfile.mkdtemp(prefix="dropu-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+
+    # The app resolves static/ relative to the working directory; keep uploads out of the repo
+    os.makedirs(os.path.join(workdir, "static", "images"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "static", "uploads", "riders"), exist_ok=True)
+    sys.path.insert(0, ROOT)
+    os.chdir(workdir)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        from main import app
+        from database import SessionLocal, engine
+        from migrations import upgrade
+        import services.auth_service as auth_service
+
+        # No SMTP during benchmarks
+        auth_service.send_welcome_email = lambda *a, **kw: True
+
+        upgrade(engine)
+        if not args.skip_seed:
+            db = SessionLocal()
+            try:
+                seed(db, args.admins, args.riders, args.feedbacks)
+            finally:
+                db.close()
+        results = asyncio.run(run(app, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "database_url": database_url.split("@")[-1],
+            "python": sys.version.split()[0],
+            "config": {k: getattr(args, k) for k in
+                       ("admins", "riders", "feedbacks", "requests", "warmup", "concurrency")},
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
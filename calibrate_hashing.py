@@ -0,0 +1,83 @@
+"""
+Pick password hashing parameters for this host.
+
+Benchmarks hashing at increasing cost and reports the most expensive
+setting whose median hash time stays within the target. Set the printed
+variables in the deployment environment; existing hashes are upgraded to
+the new parameters as users log in.
+
+    python calibrate_hashing.py                          # bcrypt, 250 ms target
+    python calibrate_hashing.py --target-ms 400
+    python calibrate_hashing.py --scheme argon2 --memory-mib 64   # needs argon2-cffi
+
+Run it on the same hardware (and with the same worker count busy, if you
+want numbers under load) that will serve logins.
+"""
+import argparse
+import statistics
+import time
+from utils.security import ARGON2_AVAILABLE, build_password_context
+
+SAMPLE_PASSWORD = "calibration-Password-123"
+
+def median_hash_ms(context, samples: int) -> float:
+    context.hash(SAMPLE_PASSWORD)  # load the backend outside the timing
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> dict:
+    # Each extra round doubles the work, so stop at the first setting over target
+    best = None
+    for rounds in range(10, 20):
+        elapsed = median_hash_ms(build_password_context("bcrypt", bcrypt_rounds=rounds), samples)
+        print(f"bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = {"BCRYPT_ROUNDS": rounds}
+    if best is None:
+        print("Even rounds=10 exceeds the target; using 10, the lowest cost worth deploying")
+    return best or {"BCRYPT_ROUNDS": 10}
+
+def calibrate_argon2(target_ms: float, samples: int, memory_mib: int, parallelism: int) -> dict:
+    # Memory is fixed by the caller (it bounds concurrent logins per host); time cost fills the budget
+    best = None
+    for time_cost in range(1, 33):
+        context = build_password_context("argon2", argon2_time_cost=time_cost,
+                                         argon2_memory_kib=memory_mib * 1024, argon2_parallelism=parallelism)
+        elapsed = median_hash_ms(context, samples)
+        print(f"argon2 time_cost={time_cost} memory={memory_mib} MiB parallelism={parallelism}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    return {
+        "PASSWORD_SCHEME": "argon2",
+        "ARGON2_TIME_COST": best or 1,
+        "ARGON2_MEMORY_KIB": memory_mib * 1024,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate password hashing cost for this host")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250, help="Upper bound for one hash (default: 250)")
+    parser.add_argument("--samples", type=int, default=5, help="Hashes timed per setting")
+    parser.add_argument("--memory-mib", type=int, default=64, help="argon2 memory per hash")
+    parser.add_argument("--parallelism", type=int, default=2, help="argon2 lanes per hash")
+    args = parser.parse_args()
+
+    if args.scheme == "argon2":
+        if not ARGON2_AVAILABLE:
+            parser.error("argon2 needs the argon2-cffi package (pip install argon2-cffi)")
+        settings = calibrate_argon2(args.target_ms, args.samples, args.memory_mib, args.parallelism)
+    else:
+        settings = calibrate_bcrypt(args.target_ms, args.samples)
+    print("\nSet in the deployment environment:")
+    for name, value in settings.items():
+        print(f"{name}={value}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 from sqlalchemy.orm import Session
-from database import SessionLocal, Base, engine
+from database import SessionLocal, engine
 from models import Admin
+from migrations import check_schema_version
 from utils.security import hash_password
 
-# Create the database tables if they don't exist
-Base.metadata.create_all(bind=engine)
+# Tables are created by `python migrate.py upgrade`
+check_schema_version(engine)
 
 # Create a database session
 db: Session = SessionLocal()
@@ -0,0 +1,244 @@
+"""
+Synthetic data generator for scale testing.
+
+Loads configurable volumes of admins, riders, agents, customers, issues and
+feedback into the database at DATABASE_URL using chunked multi-row inserts.
+Passwords are hashed in parallel with a low bcrypt cost and reused across
+users: user N of any type logs in with "synthetic-<N % password-pool>".
+
+    DATABASE_URL=sqlite:///scale.db python generate_synthetic_data.py --riders 1000000 --feedback 5000000
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from passlib.context import CryptContext
+from sqlalchemy import func
+
+from database import engine, SessionLocal, DATABASE_URL
+from migrations import upgrade
+from models import Admin, Rider, Agent, Customer, Issue, Feedback
+from services.admin_service import REGION_SUCCESS_RATES
+
+REGIONS = [r["region"] for r in REGION_SUCCESS_RATES]
+EMAIL_DOMAIN = "dropu-synth.co.ke"
+RIDER_UPLOAD_DIR = "static/uploads/riders"
+DOCUMENT_TYPES = ["id_document", "driving_license", "insurance"]
+PLACEHOLDER_PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+FIRST_NAMES = ["Brian", "Kevin", "Mercy", "Faith", "Dennis", "Grace", "Peter", "Esther", "John", "Ann",
+               "Collins", "Purity", "Samuel", "Joy", "David", "Wanjiru", "Otieno", "Achieng", "Kiprop", "Njeri"]
+LAST_NAMES = ["Kamau", "Otieno", "Mwangi", "Wanjiku", "Kiprono", "Odhiambo", "Njoroge", "Mutua", "Ochieng",
+              "Wambui", "Kariuki", "Cheruiyot", "Omondi", "Muthoni", "Kiplagat"]
+BIKE_MODELS = ["Boxer BM150", "TVS HLX 125", "Honda Ace 125", "Haojue DK150", "Yamaha Crux"]
+BIKE_COLORS = ["Red", "Black", "Blue", "Silver", "Green"]
+RELATIONSHIPS = ["Parent", "Sibling", "Spouse", "Friend", "Cousin"]
+ISSUE_TEMPLATES = [
+    "Rider unavailable for pickup in {region}",
+    "Delivery delayed over 30 minutes in {region}",
+    "Customer complaint about damaged parcel in {region}",
+    "Payment system timeout reported from {region}",
+    "Agent station offline in {region}",
+]
+FEEDBACK_TEMPLATES = [
+    "Rider arrived late to {region} and the parcel was slightly damaged",
+    "Great service in {region}, delivery was fast and the rider was polite",
+    "Could not reach the rider by phone while waiting in {region}",
+    "The agent station in {region} was closed during working hours",
+    "Delivery fee to {region} seems too high compared to last month",
+]
+FEEDBACK_CATEGORIES = ["General", "Delivery", "Rider", "Payment", "Station"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic Dropu data for scale testing.")
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--riders", type=int, default=10000)
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--feedback", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per multi-row INSERT")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="bcrypt cost for synthetic passwords")
+    parser.add_argument("--password-pool", type=int, default=64, help="Distinct password hashes to compute")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for hashing")
+    parser.add_argument("--rider-documents", choices=["shared", "per-rider", "none"], default="shared",
+                        help="Point riders at one shared placeholder PDF per type, or write one per rider")
+    parser.add_argument("--days", type=int, default=365, help="Spread timestamps over this many past days")
+    parser.add_argument("--tag", default=None, help="Suffix for emails so repeated runs don't collide")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
+    return parser.parse_args()
+
+
+def _hash(args):
+    password, rounds = args
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(password)
+
+
+def hash_password_pool(size: int, rounds: int, workers: int) -> list:
+    """Hash `size` distinct synthetic passwords across worker processes."""
+    jobs = [(f"synthetic-{i}", rounds) for i in range(size)]
+    if workers <= 1:
+        return [_hash(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_hash, jobs, chunksize=max(1, size // workers)))
+
+
+def insert_chunks(table, total: int, batch_size: int, make_row):
+    """Insert `total` rows built by make_row(i) in batches of multi-row INSERTs."""
+    started = time.perf_counter()
+    for start in range(0, total, batch_size):
+        rows = [make_row(i) for i in range(start, min(start + batch_size, total))]
+        with engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+        print(f"{table.name}: {start + len(rows)}/{total}", end="\r", flush=True)
+    if total:
+        elapsed = time.perf_counter() - started
+        print(f"{table.name}: inserted {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+def id_range(model, email_like: str):
+    """Return (min_id, max_id) of the rows just generated for a model."""
+    db = SessionLocal()
+    try:
+        return db.query(func.min(model.id), func.max(model.id)).filter(model.email.like(email_like)).one()
+    finally:
+        db.close()
+
+
+def rider_documents(mode: str, rider_index: int, tag: str) -> dict:
+    """Return document URLs for a rider, writing placeholder files as needed."""
+    if mode == "none":
+        return {doc: f"/{RIDER_UPLOAD_DIR}/synthetic-missing-{doc}.pdf" for doc in DOCUMENT_TYPES}
+    paths = {}
+    for doc in DOCUMENT_TYPES:
+        shared = os.path.join(RIDER_UPLOAD_DIR, f"synthetic-{doc}.pdf")
+        if mode == "shared":
+            paths[doc] = f"/{shared}"
+            continue
+        file_path = os.path.join(RIDER_UPLOAD_DIR, f"synthetic-{tag}-{rider_index}-{doc}.pdf")
+        try:
+            os.link(shared, file_path)
+        except OSError:
+            shutil.copyfile(shared, file_path)
+        paths[doc] = f"/{file_path}"
+    return paths
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    tag = args.tag or format(int(time.time()), "x")
+    now = datetime.utcnow()
+    span_seconds = args.days * 86400
+
+    def past():
+        return now - timedelta(seconds=rng.randrange(span_seconds))
+
+    def person():
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def email(kind, i):
+        return f"{kind}{i}.{tag}@{EMAIL_DOMAIN}"
+
+    def phone():
+        return f"07{rng.randrange(10**8):08d}"
+
+    print(f"Generating synthetic data into {DATABASE_URL.split('@')[-1]} (tag={tag})")
+    upgrade(engine)
+
+    started = time.perf_counter()
+    passwords = hash_password_pool(args.password_pool, args.bcrypt_rounds, args.workers)
+    print(f"Hashed {len(passwords)} passwords at cost {args.bcrypt_rounds} in {time.perf_counter() - started:.1f}s")
+
+    if args.rider_documents != "none":
+        os.makedirs(RIDER_UPLOAD_DIR, exist_ok=True)
+        for doc in DOCUMENT_TYPES:
+            with open(os.path.join(RIDER_UPLOAD_DIR, f"synthetic-{doc}.pdf"), "wb") as f:
+                f.write(PLACEHOLDER_PDF)
+
+    insert_chunks(Admin.__table__, args.admins, args.batch_size, lambda i: {
+        "name": person(),
+        "email": email("admin", i),
+        "password": passwords[i % len(passwords)],
+        "preferences": {"theme": rng.choice(["light", "dark"]), "notifications": rng.random() < 0.8},
+        "role": "admin",
+    })
+    admin_ids = id_range(Admin, f"%.{tag}@{EMAIL_DOMAIN}")
+    if args.riders and admin_ids[0] is None:
+        admin_ids = id_range(Admin, "%")
+        if admin_ids[0] is None:
+            raise SystemExit("Riders need an existing admin for created_by; pass --admins 1 or more")
+
+    insert_chunks(Rider.__table__, args.riders, args.batch_size, lambda i: {
+        "name": person(),
+        "email": email("rider", i),
+        "password": passwords[i % len(passwords)],
+        "bike_number": f"K{tag[-4:].upper()}{i:08d}",
+        "phone_number": phone(),
+        "bike_model": rng.choice(BIKE_MODELS),
+        "bike_color": rng.choice(BIKE_COLORS),
+        "license": f"DL{rng.randrange(10**8):08d}",
+        **rider_documents(args.rider_documents, i, tag),
+        "emergency_contact_name": person(),
+        "emergency_contact_phone": phone(),
+        "emergency_contact_relationship": rng.choice(RELATIONSHIPS),
+        "created_by": rng.randint(*admin_ids),
+        "status": "active" if rng.random() < 0.9 else "suspended",
+        "created_at": past(),
+    })
+
+    insert_chunks(Agent.__table__, args.agents, args.batch_size, lambda i: {
+        "name": person(),
+        "email": email("agent", i),
+        "password": passwords[i % len(passwords)],
+        "station_location": f"{rng.choice(REGIONS)} Station {i % 50 + 1}",
+    })
+
+    insert_chunks(Customer.__table__, args.customers, args.batch_size, lambda i: {
+        "name": person(),
+        "email": email("customer", i),
+        "password": passwords[i % len(passwords)],
+        "address": f"{rng.randint(1, 400)} {rng.choice(LAST_NAMES)} Road, {rng.choice(REGIONS)}, Nairobi",
+    })
+
+    def issue_row(i):
+        urgent = rng.random() < 0.3
+        return {
+            "description": rng.choice(ISSUE_TEMPLATES).format(region=rng.choice(REGIONS)),
+            "urgency": urgent,
+            "timestamp": past(),
+            "status": "open" if rng.random() < 0.6 else "resolved",
+        }
+
+    insert_chunks(Issue.__table__, args.issues, args.batch_size, issue_row)
+
+    generated = f"%.{tag}@{EMAIL_DOMAIN}"
+    user_types = [(kind, id_range(model, generated)) for kind, model in
+                  (("admin", Admin), ("rider", Rider), ("agent", Agent), ("customer", Customer))]
+    user_types = [(kind, ids) for kind, ids in user_types if ids[0] is not None] or [("customer", (1, 1))]
+
+    def feedback_row(i):
+        user_type, ids = rng.choice(user_types)
+        region = rng.choice(REGIONS)
+        return {
+            "user_id": rng.randint(*ids),
+            "user_type": user_type,
+            "message": rng.choice(FEEDBACK_TEMPLATES).format(region=region),
+            "region": region,
+            "category": rng.choice(FEEDBACK_CATEGORIES),
+            "status": rng.choice(["Pending", "Reviewed", "Resolved"]),
+            "rating": rng.randint(1, 5),
+            "timestamp": past(),
+        }
+
+    insert_chunks(Feedback.__table__, args.feedback, args.batch_size, feedback_row)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Production entrypoint:
+
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and its process-wide
+warmup runs before workers fork, so every worker inherits loaded schemas and
+the bcrypt backend. Each worker then fills its own connection pool and warms
+the main query paths during startup, and only then answers /ready with 200.
+"""
+import os
+
+wsgi_app = "main:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str((os.cpu_count() or 1) * 2)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+def on_starting(server):
+    from utils.warmup import preload
+    preload()
+
+def post_fork(server, worker):
+    # Never share the master's sockets with workers; each worker opens its own pool
+    from database import engine, replica_engines
+    engine.dispose(close=False)
+    for replica in replica_engines:
+        replica.dispose(close=False)
@@ -1,11 +1,60 @@
-from fastapi import FastAPI
-from database import Base, engine
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from database import engine, SessionLocal, ReadYourWritesMiddleware
+from migrations import check_schema_version
+from utils.warmup import is_ready, warm_worker
+from services.dispatch_service import rebuild_rider_index, rider_index_refresher
+from services.order_service import order_ingestor
+from services.location_service import location_ingestor
+from services.live_service import rider_feed
+from services.file_service import file_collector
+from services.feedback_service import feedback_classifier, feedback_ingestor
+from utils.serialization import FastJSONResponse
+from utils.compression import CompressionMiddleware
+from utils.idempotency import IdempotencyMiddleware
 from routes import auth_router, admin_router, rider_router, agent_router, customer_router, super_admin_router
 from fastapi.staticfiles import StaticFiles
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by `python migrate.py upgrade`; workers only check the version
+    check_schema_version(engine)
+    try:
+        with SessionLocal() as db:
+            print(f"Rider index loaded with {rebuild_rider_index(db)} available riders")
+        warm_worker()
+    except Exception as e:
+        # Keep serving, but /ready stays 503 so the load balancer holds traffic back
+        print(f"Warmup failed: {e}")
+    order_ingestor.start()
+    rider_index_refresher.start()
+    location_ingestor.start()
+    rider_feed.start()
+    file_collector.start()
+    feedback_classifier.start()
+    feedback_ingestor.start()
+    yield
+    feedback_ingestor.stop()
+    feedback_classifier.stop()
+    file_collector.stop()
+    await rider_feed.stop()
+    location_ingestor.stop()
+    rider_index_refresher.stop()
+    order_ingestor.stop()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+app.add_middleware(ReadYourWritesMiddleware)
+# Inside compression, so stored responses are uncompressed and replays are compressed per client
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    gzip_level=int(os.getenv("GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("BROTLI_QUALITY", "4")),
+    exclude_paths=("/static/images", "/static/uploads"),
+)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -18,4 +67,10 @@ app.include_router(super_admin_router)
 
 @app.get("/")
 def home():
-    return {"message": "Welcome to Dropu Logistics Management System API"}
\ No newline at end of file
+    return {"message": "Welcome to Dropu Logistics Management System API"}
+
+@app.get("/ready")
+def ready():
+    if not is_ready():
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready"}
@@ -0,0 +1,29 @@
+"""
+Apply or inspect schema migrations for the database at DATABASE_URL.
+
+    python migrate.py upgrade          # apply all pending migrations
+    python migrate.py upgrade --to 1   # stop at a given version
+    python migrate.py current          # show applied and expected versions
+"""
+import argparse
+from database import engine
+from migrations import SCHEMA_VERSION, current_version, upgrade
+
+def main():
+    parser = argparse.ArgumentParser(description="Dropu schema migrations")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subcommands.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, default=None, help="Target version (default: latest)")
+    subcommands.add_parser("current", help="Show the database schema version")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.to)
+        if applied:
+            print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+        else:
+            print("Database already up to date")
+    print(f"Database schema version: {current_version(engine)} (code expects {SCHEMA_VERSION})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Versioned schema migrations.
+
+Each script in migrations/versions is named NNNN_description.py and defines
+upgrade(engine). Applied versions are recorded in the schema_version table;
+`python migrate.py upgrade` applies pending scripts in order, and app startup
+only compares the recorded version with SCHEMA_VERSION.
+"""
+import importlib
+import os
+import re
+from sqlalchemy import Column, Integer, DateTime, MetaData, Table, select, func
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+_SCRIPT_NAME = re.compile(r"^(\d{4})_\w+\.py$")
+
+_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+def list_migrations():
+    """Return [(version, module_name)] for every script, sorted by version."""
+    scripts = []
+    for filename in os.listdir(VERSIONS_DIR):
+        match = _SCRIPT_NAME.match(filename)
+        if match:
+            scripts.append((int(match.group(1)), filename[:-3]))
+    return sorted(scripts)
+
+SCHEMA_VERSION = max((version for version, _ in list_migrations()), default=0)
+
+def current_version(engine) -> int:
+    """Highest applied migration, or 0 for a database that has never been migrated."""
+    schema_version_table.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+
+def upgrade(engine, target: int = None) -> list:
+    """Apply pending migrations up to target (default: latest). Returns versions applied."""
+    target = SCHEMA_VERSION if target is None else target
+    applied = []
+    version = current_version(engine)
+    for number, module_name in list_migrations():
+        if number <= version or number > target:
+            continue
+        print(f"Applying migration {module_name}")
+        module = importlib.import_module(f"migrations.versions.{module_name}")
+        module.upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(schema_version_table.insert().values(version=number))
+        applied.append(number)
+    return applied
+
+def check_schema_version(engine):
+    """Fail fast when the database schema is not at the version this code expects."""
+    with engine.connect() as conn:
+        try:
+            version = conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+        except Exception:
+            version = 0
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, code expects {SCHEMA_VERSION}. "
+            f"Run 'python migrate.py upgrade'."
+        )
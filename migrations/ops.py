@@ -0,0 +1,50 @@
+"""Schema operations shared by migration scripts."""
+from sqlalchemy import inspect, text
+
+def has_index(engine, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(engine).get_indexes(table))
+
+def has_column(engine, table: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(engine).get_columns(table))
+
+def create_index(engine, name: str, table: str, columns: list, unique: bool = False):
+    """
+    Create an index without blocking writes where the backend allows it.
+    MySQL builds it in place with LOCK=NONE; PostgreSQL uses CONCURRENTLY,
+    which must run outside a transaction. Skips indexes that already exist.
+    """
+    if has_index(engine, table, name):
+        print(f"Index {name} already exists, skipping")
+        return
+    unique_sql = "UNIQUE " if unique else ""
+    column_sql = ", ".join(columns)
+    dialect = engine.dialect.name
+    if dialect == "mysql":
+        statement = f"CREATE {unique_sql}INDEX {name} ON {table} ({column_sql}) ALGORITHM=INPLACE LOCK=NONE"
+    elif dialect == "postgresql":
+        statement = f"CREATE {unique_sql}INDEX CONCURRENTLY {name} ON {table} ({column_sql})"
+    else:
+        statement = f"CREATE {unique_sql}INDEX {name} ON {table} ({column_sql})"
+    if dialect == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(statement))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+    print(f"Created index {name} on {table}({column_sql})")
+
+def add_column(engine, table: str, name: str, ddl, constraints: str = ""):
+    """
+    Add a column, skipping it if present. ddl is either a raw DDL type/default
+    clause or a SQLAlchemy type, which is compiled for the engine's dialect
+    (e.g. DateTime() becomes DATETIME on MySQL and TIMESTAMP on PostgreSQL);
+    constraints is appended as-is, e.g. "NULL".
+    """
+    if has_column(engine, table, name):
+        print(f"Column {table}.{name} already exists, skipping")
+        return
+    if not isinstance(ddl, str):
+        ddl = ddl.compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl} {constraints}".rstrip()))
+    print(f"Added column {table}.{name}")
@@ -0,0 +1,102 @@
+"""Initial schema, matching what Base.metadata.create_all used to build at startup."""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, MetaData, Table
+
+metadata = MetaData()
+
+Table(
+    "admins", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("profile_picture", String(255), nullable=True),
+    Column("last_login", DateTime, nullable=True),
+    Column("preferences", JSON, nullable=True, default={}),
+    Column("role", String(20), nullable=False, default="admin"),
+)
+
+Table(
+    "riders", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("bike_number", String(50), unique=True, nullable=True),
+    Column("phone_number", String(20), nullable=False),
+    Column("bike_model", String(100), nullable=False),
+    Column("bike_color", String(50), nullable=False),
+    Column("license", String(100), nullable=False),
+    Column("id_document", String(255), nullable=False),
+    Column("driving_license", String(255), nullable=False),
+    Column("insurance", String(255), nullable=False),
+    Column("emergency_contact_name", String(100), nullable=False),
+    Column("emergency_contact_phone", String(20), nullable=False),
+    Column("emergency_contact_relationship", String(50), nullable=False),
+    Column("created_by", Integer, ForeignKey("admins.id"), nullable=False),
+    Column("status", String(20), nullable=False, default="active"),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+Table(
+    "agents", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("station_location", String(255), nullable=True),
+)
+
+Table(
+    "customers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("address", String(255), nullable=True),
+)
+
+Table(
+    "issues", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("description", String(255), nullable=False),
+    Column("urgency", Boolean, default=False),
+    Column("timestamp", DateTime, default=datetime.utcnow),
+    Column("status", String(20), default="open"),
+)
+
+Table(
+    "feedback", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, nullable=False),
+    Column("user_type", String(20), nullable=False),
+    Column("message", String(1000), nullable=False),
+    Column("region", String(100), nullable=False),
+    Column("category", String(50), nullable=False),
+    Column("status", String(50), nullable=False),
+    Column("rating", Integer, nullable=False),
+    Column("timestamp", DateTime, default=datetime.utcnow),
+)
+
+Table(
+    "verification_codes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("admin_id", Integer, ForeignKey("admins.id"), nullable=False),
+    Column("code", String(6), nullable=False),
+    Column("type", String(20), nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+Table(
+    "reset_tokens", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("rider_id", Integer, ForeignKey("riders.id"), nullable=False),
+    Column("token", String(8), nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+def upgrade(engine):
+    # checkfirst keeps this safe on databases previously built by create_all
+    metadata.create_all(bind=engine, checkfirst=True)
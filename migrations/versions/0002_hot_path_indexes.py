@@ -0,0 +1,11 @@
+"""Indexes for the filters and joins used by admin dashboards and login."""
+from migrations.ops import create_index
+
+def upgrade(engine):
+    create_index(engine, "ix_feedback_region_timestamp", "feedback", ["region", "timestamp"])
+    create_index(engine, "ix_feedback_timestamp", "feedback", ["timestamp"])
+    create_index(engine, "ix_feedback_user", "feedback", ["user_id", "user_type"])
+    create_index(engine, "ix_issues_urgency_timestamp", "issues", ["urgency", "timestamp"])
+    create_index(engine, "ix_riders_created_by", "riders", ["created_by"])
+    create_index(engine, "ix_reset_tokens_token", "reset_tokens", ["token"])
+    create_index(engine, "ix_verification_codes_admin_type", "verification_codes", ["admin_id", "type"])
@@ -0,0 +1,6 @@
+"""Version counters on admins and riders for ETags and optimistic concurrency."""
+from migrations.ops import add_column
+
+def upgrade(engine):
+    add_column(engine, "admins", "version", "INTEGER NOT NULL DEFAULT 1")
+    add_column(engine, "riders", "version", "INTEGER NOT NULL DEFAULT 1")
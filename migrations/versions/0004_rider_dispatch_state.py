@@ -0,0 +1,10 @@
+"""Last-known location and availability on riders for dispatch."""
+from sqlalchemy import DateTime
+from migrations.ops import add_column, create_index
+
+def upgrade(engine):
+    add_column(engine, "riders", "availability", "VARCHAR(20) NOT NULL DEFAULT 'offline'")
+    add_column(engine, "riders", "last_latitude", "FLOAT NULL")
+    add_column(engine, "riders", "last_longitude", "FLOAT NULL")
+    add_column(engine, "riders", "last_seen_at", DateTime(), "NULL")
+    create_index(engine, "ix_riders_status_availability", "riders", ["status", "availability"])
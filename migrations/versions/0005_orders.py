@@ -0,0 +1,34 @@
+"""Delivery orders with hot-path indexes for customer history and rider work queues."""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, MetaData, Table
+from migrations.ops import create_index
+
+metadata = MetaData()
+
+Table("customers", metadata, Column("id", Integer, primary_key=True))
+Table("riders", metadata, Column("id", Integer, primary_key=True))
+Table("agents", metadata, Column("id", Integer, primary_key=True))
+
+orders = Table(
+    "orders", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("reference", String(32), unique=True, nullable=False),
+    Column("customer_id", Integer, ForeignKey("customers.id"), nullable=False),
+    Column("rider_id", Integer, ForeignKey("riders.id"), nullable=True),
+    Column("agent_id", Integer, ForeignKey("agents.id"), nullable=True),
+    Column("pickup_address", String(255), nullable=False),
+    Column("pickup_latitude", Float, nullable=True),
+    Column("pickup_longitude", Float, nullable=True),
+    Column("dropoff_address", String(255), nullable=False),
+    Column("dropoff_latitude", Float, nullable=True),
+    Column("dropoff_longitude", Float, nullable=True),
+    Column("package_description", String(255), nullable=True),
+    Column("status", String(20), nullable=False, default="pending"),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+    Column("updated_at", DateTime, nullable=True),
+)
+
+def upgrade(engine):
+    orders.create(bind=engine, checkfirst=True)
+    create_index(engine, "ix_orders_customer_created", "orders", ["customer_id", "created_at"])
+    create_index(engine, "ix_orders_rider_status", "orders", ["rider_id", "status"])
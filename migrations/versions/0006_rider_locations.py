@@ -0,0 +1,20 @@
+"""GPS trail history for riders."""
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, MetaData, Table
+from migrations.ops import create_index
+
+metadata = MetaData()
+
+Table("riders", metadata, Column("id", Integer, primary_key=True))
+
+rider_locations = Table(
+    "rider_locations", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("rider_id", Integer, ForeignKey("riders.id"), nullable=False),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("recorded_at", DateTime, nullable=False),
+)
+
+def upgrade(engine):
+    rider_locations.create(bind=engine, checkfirst=True)
+    create_index(engine, "ix_rider_locations_rider_recorded", "rider_locations", ["rider_id", "recorded_at"])
@@ -0,0 +1,15 @@
+"""Queue of stored uploads to remove once the transaction that released them commits."""
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table
+
+metadata = MetaData()
+
+pending_file_deletions = Table(
+    "pending_file_deletions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("path", String(255), nullable=False),
+    Column("requested_at", DateTime),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+)
+
+def upgrade(engine):
+    pending_file_deletions.create(bind=engine, checkfirst=True)
@@ -0,0 +1,43 @@
+"""Full-text index over feedback messages, using each backend's own engine."""
+from sqlalchemy import text
+from migrations.ops import has_index
+
+SQLITE_STATEMENTS = [
+    # External-content FTS5 table kept in step with feedback by triggers
+    "CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5("
+    "message, content='feedback', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS feedback_fts_insert AFTER INSERT ON feedback BEGIN "
+    "INSERT INTO feedback_fts(rowid, message) VALUES (new.id, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS feedback_fts_delete AFTER DELETE ON feedback BEGIN "
+    "INSERT INTO feedback_fts(feedback_fts, rowid, message) VALUES ('delete', old.id, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS feedback_fts_update AFTER UPDATE OF message ON feedback BEGIN "
+    "INSERT INTO feedback_fts(feedback_fts, rowid, message) VALUES ('delete', old.id, old.message); "
+    "INSERT INTO feedback_fts(rowid, message) VALUES (new.id, new.message); END",
+    "INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')",
+]
+
+def upgrade(engine):
+    dialect = engine.dialect.name
+    if dialect == "mysql":
+        if has_index(engine, "feedback", "ft_feedback_message"):
+            print("Index ft_feedback_message already exists, skipping")
+            return
+        # The first FULLTEXT index on an InnoDB table rebuilds it and can't use LOCK=NONE; run off-peak
+        with engine.begin() as conn:
+            conn.execute(text("CREATE FULLTEXT INDEX ft_feedback_message ON feedback (message)"))
+        print("Created full-text index ft_feedback_message on feedback(message)")
+    elif dialect == "postgresql":
+        if has_index(engine, "feedback", "ft_feedback_message"):
+            print("Index ft_feedback_message already exists, skipping")
+            return
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("CREATE INDEX CONCURRENTLY ft_feedback_message ON feedback "
+                              "USING GIN (to_tsvector('english', message))"))
+        print("Created full-text index ft_feedback_message on feedback(message)")
+    elif dialect == "sqlite":
+        with engine.begin() as conn:
+            for statement in SQLITE_STATEMENTS:
+                conn.execute(text(statement))
+        print("Created FTS5 table feedback_fts for feedback(message)")
+    else:
+        print(f"No full-text index for dialect {dialect}; feedback search will scan")
@@ -0,0 +1,9 @@
+"""Urgency flag and classification marker for feedback."""
+from sqlalchemy import DateTime
+from migrations.ops import add_column, create_index
+
+def upgrade(engine):
+    add_column(engine, "feedback", "urgency", "BOOLEAN NOT NULL DEFAULT FALSE")
+    add_column(engine, "feedback", "classified_at", DateTime(), "NULL")
+    # The classifier scans for unclassified rows oldest first
+    create_index(engine, "ix_feedback_classified", "feedback", ["classified_at", "id"])
@@ -0,0 +1,7 @@
+"""Submission key for feedback written through the buffered ingestor."""
+from migrations.ops import add_column, create_index
+
+def upgrade(engine):
+    add_column(engine, "feedback", "submission_id", "VARCHAR(32) NULL")
+    # Replaying a spill file skips submissions that already reached the table
+    create_index(engine, "ix_feedback_submission_id", "feedback", ["submission_id"], unique=True)
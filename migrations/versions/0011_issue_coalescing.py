@@ -0,0 +1,10 @@
+"""Fingerprint, occurrence count and last-seen time for coalescing repeated issues."""
+from sqlalchemy import DateTime
+from migrations.ops import add_column, create_index
+
+def upgrade(engine):
+    add_column(engine, "issues", "fingerprint", "VARCHAR(40) NULL")
+    add_column(engine, "issues", "occurrences", "INTEGER NOT NULL DEFAULT 1")
+    add_column(engine, "issues", "last_seen", DateTime(), "NULL")
+    # create_issue looks up the open issue for a fingerprint seen within the window
+    create_index(engine, "ix_issues_fingerprint_status", "issues", ["fingerprint", "status", "last_seen"])
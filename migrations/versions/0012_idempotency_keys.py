@@ -0,0 +1,19 @@
+"""Stored responses for POST requests retried with an Idempotency-Key header."""
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, MetaData, Table, Index
+
+metadata = MetaData()
+
+idempotency_keys = Table(
+    "idempotency_keys", metadata,
+    Column("key_hash", String(32), primary_key=True),
+    Column("fingerprint", String(32), nullable=False),
+    Column("status_code", Integer, nullable=True),
+    Column("content_type", String(100), nullable=True),
+    Column("body", LargeBinary, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_idempotency_keys_expires", "expires_at"),
+)
+
+def upgrade(engine):
+    idempotency_keys.create(bind=engine, checkfirst=True)
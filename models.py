@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, Float, Index, LargeBinary
 from database import Base
 
 class Admin(Base):
@@ -12,6 +12,10 @@ class Admin(Base):
     last_login = Column(DateTime, nullable=True)
     preferences = Column(JSON, nullable=True, default={})
     role = Column(String(20), nullable=False, default="admin")
+    # Bumped by the ORM on every UPDATE; used for ETags and optimistic concurrency
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
     
 class Rider(Base):
     __tablename__ = "riders"
@@ -33,6 +37,14 @@ class Rider(Base):
     created_by = Column(Integer, ForeignKey("admins.id"), nullable=False)
     status = Column(String(20), nullable=False, default="active")
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Dispatch state: availability only counts while status is "active"
+    availability = Column(String(20), nullable=False, default="offline", server_default="offline")
+    last_latitude = Column(Float, nullable=True)
+    last_longitude = Column(Float, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
 class Agent(Base):
     __tablename__ = "agents"
@@ -57,6 +69,9 @@ class Issue(Base):
     urgency = Column(Boolean, default=False)  
     timestamp = Column(DateTime, default=datetime.utcnow)  
     status = Column(String(20), default="open")
+    fingerprint = Column(String(40), nullable=True)  # normalized description + flags; repeats coalesce onto one open issue
+    occurrences = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen = Column(DateTime, nullable=True)
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -69,6 +84,9 @@ class Feedback(Base):
     status = Column(String(50), nullable=False)
     rating = Column(Integer, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    urgency = Column(Boolean, nullable=False, default=False, server_default="0")
+    classified_at = Column(DateTime, nullable=True)  # set once the classifier has processed the row
+    submission_id = Column(String(32), nullable=True)  # buffered ingestion key; makes spill replays idempotent
 
 class VerificationCode(Base):
     __tablename__ = "verification_codes"
@@ -85,4 +103,60 @@ class ResetToken(Base):
     rider_id = Column(Integer, ForeignKey("riders.id"), nullable=False)
     token = Column(String(8), nullable=False)
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Order(Base):
+    __tablename__ = "orders"
+    id = Column(Integer, primary_key=True, index=True)
+    reference = Column(String(32), unique=True, nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    rider_id = Column(Integer, ForeignKey("riders.id"), nullable=True)
+    agent_id = Column(Integer, ForeignKey("agents.id"), nullable=True)  # pickup/drop-off station
+    pickup_address = Column(String(255), nullable=False)
+    pickup_latitude = Column(Float, nullable=True)
+    pickup_longitude = Column(Float, nullable=True)
+    dropoff_address = Column(String(255), nullable=False)
+    dropoff_latitude = Column(Float, nullable=True)
+    dropoff_longitude = Column(Float, nullable=True)
+    package_description = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_orders_customer_created", "customer_id", "created_at"),
+        Index("ix_orders_rider_status", "rider_id", "status"),
+    )
+
+class RiderLocation(Base):
+    __tablename__ = "rider_locations"
+    id = Column(Integer, primary_key=True)
+    rider_id = Column(Integer, ForeignKey("riders.id"), nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rider_locations_rider_recorded", "rider_id", "recorded_at"),
+    )
+
+class PendingFileDeletion(Base):
+    __tablename__ = "pending_file_deletions"
+    id = Column(Integer, primary_key=True)
+    path = Column(String(255), nullable=False)
+    requested_at = Column(DateTime, default=datetime.utcnow)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    key_hash = Column(String(32), primary_key=True)  # digest of caller, route and Idempotency-Key header
+    fingerprint = Column(String(32), nullable=False)  # digest of the request body
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is still running
+    content_type = Column(String(100), nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires", "expires_at"),
+    )
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Response, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from database import get_db
-from utils.auth_middleware import get_current_user
+from sqlalchemy.orm.exc import StaleDataError
+from database import get_db, get_read_db, ReadSessionLocal
+from utils.auth_middleware import get_current_user, get_current_admin
 from utils.email_service import send_verification_code
+from utils.serialization import adapter_response, FastJSONResponse
+from utils.etag import make_etag, etag_matches, not_modified, if_match_version
+import asyncio
+import queue
+from collections import Counter
 import random
 from services.admin_service import (
-    get_admin_profile,
     update_admin_profile_picture,
     create_issue,
     get_urgent_issues,
@@ -16,11 +22,22 @@ from services.admin_service import (
     create_feedback,
     get_feedbacks,
     delete_admin_account,
+    get_admins,
     get_riders,
     get_rider_by_id,
+    get_rider_version,
     update_rider,
     delete_rider,
+    bulk_update_rider_status,
+    bulk_delete_riders,
 )
+from services.dispatch_service import find_nearest_riders, dispatch_nearest_rider
+from services.routing_service import plan_routes
+from services.overview_service import build_admin_overview
+from services.feedback_service import search_feedbacks, feedback_ingestor, build_feedback_row
+from services.order_service import update_order_status
+from services.live_service import rider_feed, parse_viewport, load_snapshot
+from schemas.order_schema import OrderStatusUpdate, OrderResponse
 from services.auth_service import register_rider_by_admin, register_agent_by_admin, resend_rider_verification_email
 from schemas.admin_schema import (
     AdminProfileResponse,
@@ -32,12 +49,29 @@ from schemas.admin_schema import (
     TopRegionResponse,
     FeedbackCreate,
     FeedbackResponse,
+    FeedbackAcceptedResponse,
     AdminProfileUpdate,
     DeleteAccountResponse,
     RiderResponse,
     RiderUpdate,
     RiderUpdateResponse,
     PaginatedRiderResponse,
+    PaginatedAdminResponse,
+    PaginatedAdminAdapter,
+    IssueListAdapter,
+    FeedbackListAdapter,
+    FeedbackSearchResult,
+    FeedbackSearchAdapter,
+    DispatchRequest,
+    DispatchResponse,
+    RoutePlanRequest,
+    RoutePlanResponse,
+    RiderBulkSelection,
+    RiderBulkStatusRequest,
+    RiderBulkResponse,
+    AdminOverviewResponse,
+    parse_rider_fields,
+    rider_fields_adapters,
 )
 from schemas.auth_schema import UserRegistration, UserResponse, RiderRegistration
 from models import Admin, VerificationCode, Rider
@@ -53,15 +87,24 @@ def admin_dashboard(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not authorized")
     return {"message": f"Welcome to Admin Dashboard, {current_user['user_id']}"}
 
+@router.get("/overview", response_model=AdminOverviewResponse)
+async def get_overview(admin: Admin = Depends(get_current_admin)):
+    """
+    The landing page's dashboard, profile, preferences, priorities, notifications
+    and top-regions in one round trip, sharing a single principal lookup.
+    """
+    return FastJSONResponse(await build_admin_overview(admin))
+
 @router.get("/profile", response_model=AdminProfileResponse)
-def get_profile(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    admin = get_admin_profile(db, current_user["user_id"])
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    
+def get_profile(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    admin: Admin = Depends(get_current_admin)
+):
+    etag = make_etag("admin-profile", admin.id, admin.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     print(f"GET /admin/profile response: {admin.__dict__}")
     return admin
 
@@ -72,15 +115,14 @@ def update_profile(
     email: str = Form(None),
     password: str = Form(None),
     verification_code: str = Form(None),
-    current_user: dict = Depends(get_current_user),
+    response: Response = None,
+    if_match: Optional[str] = Header(None),
+    admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    admin = db.query(Admin).filter(Admin.id == current_user["user_id"]).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
+    expected_version = if_match_version(if_match, "admin-profile", admin.id)
+    if expected_version is not None and expected_version != admin.version:
+        raise HTTPException(status_code=412, detail="Profile was modified by another request")
     
     update_data = AdminProfileUpdate(
         name=name,
@@ -98,10 +140,7 @@ def update_profile(
             error_msg = f"Invalid content type: {file.content_type}. Only JPEG or PNG files are allowed"
             print(error_msg)
             raise HTTPException(status_code=400, detail=error_msg)
-        profile_picture_url = update_admin_profile_picture(db, current_user["user_id"], file)
-        if not profile_picture_url:
-            raise HTTPException(status_code=404, detail="Admin not found")
-        admin.profile_picture = profile_picture_url
+        profile_picture_url = update_admin_profile_picture(db, admin, file)
         print(f"Updated profile_picture: {profile_picture_url}")
     
     if update_data.name:
@@ -121,7 +160,7 @@ def update_profile(
             raise HTTPException(status_code=400, detail=error_msg)
         
         verification = db.query(VerificationCode).filter(
-            VerificationCode.admin_id == current_user["user_id"],
+            VerificationCode.admin_id == admin.id,
             VerificationCode.code == update_data.verification_code,
             VerificationCode.expires_at > datetime.utcnow()
         ).first()
@@ -152,29 +191,32 @@ def update_profile(
         print(error_msg)
         raise HTTPException(status_code=400, detail=error_msg)
     
-    db.flush()
-    db.commit()
-    db.refresh(admin)
-    print(f"After commit - Admin: name={admin.name}, email={admin.email}, profile_picture={admin.profile_picture}")
-    
+    try:
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=412, detail="Profile was modified by another request")
+    # Build the result before committing so the expired instance isn't reloaded
+    result = {"name": admin.name, "email": admin.email, "profile_picture": admin.profile_picture}
+    response.headers["ETag"] = make_etag("admin-profile", admin.id, admin.version)
     if update_data.email or update_data.password:
         db.query(VerificationCode).filter(
-            VerificationCode.admin_id == current_user["user_id"],
+            VerificationCode.admin_id == admin.id,
             VerificationCode.code == update_data.verification_code
         ).delete()
-        db.commit()
+    db.commit()
+    print(f"After commit - Admin: name={result['name']}, email={result['email']}, profile_picture={result['profile_picture']}")
     
-    response = {"name": admin.name, "email": admin.email, "profile_picture": admin.profile_picture}
-    print(f"PUT /admin/profile response: {response}")
-    return response
+    print(f"PUT /admin/profile response: {result}")
+    return result
 
 @router.get("/priorities", response_model=List[IssueResponse])
-def get_priorities(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_priorities(current_user: dict = Depends(get_current_user), db: Session = Depends(get_read_db)):
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     urgent_issues = get_urgent_issues(db)
-    return urgent_issues
+    return adapter_response(IssueListAdapter, urgent_issues)
 
 @router.get("/notifications", response_model=List[IssueResponse])
 def get_notifications(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -182,41 +224,38 @@ def get_notifications(current_user: dict = Depends(get_current_user), db: Sessio
         raise HTTPException(status_code=403, detail="Not authorized")
     
     non_urgent_issues = get_non_urgent_issues(db)
-    return non_urgent_issues
+    return adapter_response(IssueListAdapter, non_urgent_issues)
 
 @router.get("/preferences", response_model=AdminPreferencesResponse)
-def get_preferences(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    preferences = get_admin_preferences(db, current_user["user_id"])
-    if preferences is None:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    return preferences
+def get_preferences(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    admin: Admin = Depends(get_current_admin)
+):
+    etag = make_etag("admin-preferences", admin.id, admin.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return get_admin_preferences(admin)
 
 @router.put("/preferences", response_model=AdminPreferencesResponse)
 def update_preferences(
     preferences: AdminPreferences,
-    current_user: dict = Depends(get_current_user),
+    admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    updated_preferences = update_admin_preferences(db, current_user["user_id"], preferences.dict())
-    if updated_preferences is None:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    return updated_preferences
+    return update_admin_preferences(db, admin, preferences.dict())
 
 @router.get("/top-regions", response_model=List[TopRegionResponse])
-def get_top_regions_endpoint(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_top_regions_endpoint(current_user: dict = Depends(get_current_user), db: Session = Depends(get_read_db)):
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     top_regions = get_top_regions(db)
     return top_regions
 
-@router.post("/feedback", response_model=FeedbackResponse)
+@router.post("/feedback", response_model=FeedbackResponse,
+             responses={202: {"model": FeedbackAcceptedResponse, "description": "Queued (buffered ingestion)"}})
 def submit_feedback(
     feedback: FeedbackCreate,
     current_user: dict = Depends(get_current_user),
@@ -225,6 +264,12 @@ def submit_feedback(
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    if feedback_ingestor.enabled:
+        try:
+            submission_id = feedback_ingestor.submit(build_feedback_row(current_user["user_id"], "admin", feedback.message))
+        except (queue.Full, RuntimeError):
+            raise HTTPException(status_code=503, detail="Feedback intake is busy, please retry")
+        return FastJSONResponse({"submission_id": submission_id, "status": "queued"}, status_code=202)
     feedback_entry = create_feedback(db, current_user["user_id"], "admin", feedback.message)
     return feedback_entry
 
@@ -236,7 +281,7 @@ def get_feedbacks_endpoint(
     sort_by: str = "date",
     sort_order: str = "desc",
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -245,7 +290,35 @@ def get_feedbacks_endpoint(
     end_date = datetime.fromisoformat(date_end) if date_end else None
     
     feedbacks = get_feedbacks(db, region, start_date, end_date, sort_by, sort_order)
-    return feedbacks
+    return adapter_response(FeedbackListAdapter, feedbacks)
+
+@router.get("/feedbacks/search", response_model=List[FeedbackSearchResult])
+def search_feedbacks_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    region: Optional[str] = None,
+    date_start: Optional[str] = None,
+    date_end: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=10000),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Full-text search over feedback messages, best matches first.
+    - q: words that must all appear; use "double quotes" for an exact phrase
+    - region, date_start, date_end: same filters as /feedbacks
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    start_date = datetime.fromisoformat(date_start) if date_start else None
+    end_date = datetime.fromisoformat(date_end) if date_end else None
+    
+    try:
+        results = search_feedbacks(db, q, region, start_date, end_date, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return adapter_response(FeedbackSearchAdapter, results)
 
 @router.post("/register-rider", response_model=UserResponse)
 def register_rider(
@@ -321,24 +394,16 @@ def register_agent(
 @router.post("/send-verification-code")
 def send_verification_code_endpoint(
     type: str,
-    current_user: dict = Depends(get_current_user),
+    admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     if type not in ["email", "password"]:
         raise HTTPException(status_code=400, detail="Invalid type. Must be 'email' or 'password'")
     
-    admin = db.query(Admin).filter(Admin.id == current_user["user_id"]).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    
     db.query(VerificationCode).filter(
-        VerificationCode.admin_id == current_user["user_id"],
+        VerificationCode.admin_id == admin.id,
         VerificationCode.type == type
     ).delete()
-    db.commit()
     
     code = str(random.randint(100000, 999999))
     expires_at = datetime.utcnow() + timedelta(minutes=10)
@@ -350,9 +415,10 @@ def send_verification_code_endpoint(
         expires_at=expires_at
     )
     db.add(verification)
+    email = admin.email
     db.commit()
     
-    if not send_verification_code(admin.email, code):
+    if not send_verification_code(email, code):
         raise HTTPException(status_code=500, detail="Failed to send verification code")
     
     return {"message": "Verification code sent to your email"}
@@ -362,21 +428,14 @@ def verify_code(
     code: str,
     type: str,
     new_value: str,
-    current_user: dict = Depends(get_current_user),
+    admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    if current_user["role"] not in ["admin", "super_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     if type not in ["email", "password"]:
         raise HTTPException(status_code=400, detail="Invalid type. Must be 'email' or 'password'")
     
-    admin = db.query(Admin).filter(Admin.id == current_user["user_id"]).first()
-    if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
-    
     verification = db.query(VerificationCode).filter(
-        VerificationCode.admin_id == current_user["user_id"],
+        VerificationCode.admin_id == admin.id,
         VerificationCode.code == code,
         VerificationCode.type == type,
         VerificationCode.expires_at > datetime.utcnow()
@@ -392,7 +451,6 @@ def verify_code(
     
     db.delete(verification)
     db.commit()
-    db.refresh(admin)
     
     return {"message": f"{type.capitalize()} updated successfully"}
 
@@ -422,18 +480,35 @@ def delete_account(current_user: dict = Depends(get_current_user), db: Session =
     print(f"Account deletion successful for user_id={current_user['user_id']}")
     return {"message": "Account deleted successfully"}
 
+@router.get("/admins", response_model=PaginatedAdminResponse)
+def list_admins(
+    after: Optional[int] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Admin directory in id order; pass next_cursor as `after` for the next page."""
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if limit <= 0 or limit > 200:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 200")
+    page = get_admins(db, after, limit)
+    return adapter_response(PaginatedAdminAdapter, {**page, "limit": limit})
+
 @router.get("/riders", response_model=PaginatedRiderResponse)
 def get_all_riders(
     search: str = None,
     skip: int = 0,
     limit: int = 10,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Fetch all riders with optional search by first_name or last_name, supporting pagination.
     - skip: Number of records to skip (default: 0)
     - limit: Maximum number of records to return (default: 10, max: 100)
+    - fields: Comma-separated rider fields to return, e.g. "name,status" (default: all)
     """
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -442,27 +517,56 @@ def get_all_riders(
         raise HTTPException(status_code=400, detail="Skip must be non-negative")
     if limit <= 0 or limit > 100:
         raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
+    try:
+        rider_fields = parse_rider_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    riders_data = get_riders(db, search, skip, limit)
-    return {
+    riders_data = get_riders(db, search, skip, limit, rider_fields)
+    _, page_adapter = rider_fields_adapters(rider_fields)
+    return adapter_response(page_adapter, {
         "total": riders_data["total"],
         "skip": skip,
         "limit": limit,
         "riders": riders_data["riders"]
-    }
+    })
 
 @router.get("/riders/{rider_id}", response_model=RiderResponse)
-def get_single_rider(rider_id: int, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_single_rider(
+    rider_id: int,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
     Fetch a single rider by ID.
+    - fields: Comma-separated rider fields to return (default: all)
     """
     if current_user["role"] not in ["admin", "super_admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        rider_fields = parse_rider_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    rider = get_rider_by_id(db, rider_id)
+    variant = None if fields is None else rider_fields
+    if if_none_match:
+        # Answer revalidation from the version column alone, without loading the row
+        version = get_rider_version(db, rider_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Rider not found")
+        etag = make_etag("rider", rider_id, version, variant)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    rider = get_rider_by_id(db, rider_id, rider_fields)
     if not rider:
         raise HTTPException(status_code=404, detail="Rider not found")
-    return rider
+    rider_adapter, _ = rider_fields_adapters(rider_fields)
+    response = adapter_response(rider_adapter, rider)
+    response.headers["ETag"] = make_etag("rider", rider_id, rider.version, variant)
+    return response
 
 @router.put("/riders/{rider_id}", response_model=RiderUpdateResponse)
 def update_rider_details(
@@ -480,6 +584,8 @@ def update_rider_details(
     emergency_contact_relationship: Optional[str] = Form(None),
     driving_license: UploadFile = File(None),
     insurance: UploadFile = File(None),
+    response: Response = None,
+    if_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -503,15 +609,17 @@ def update_rider_details(
         "emergency_contact_relationship": emergency_contact_relationship
     }
     update_data = {k: v for k, v in update_data.items() if v is not None}
+    expected_version = if_match_version(if_match, "rider", rider_id)
 
     try:
-        updated_rider = update_rider(db, rider_id, update_data, driving_license, insurance)
+        updated_rider = update_rider(db, rider_id, update_data, driving_license, insurance, expected_version)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
     if not updated_rider:
         raise HTTPException(status_code=404, detail="Rider not found")
     
+    response.headers["ETag"] = make_etag("rider", rider_id, updated_rider.version)
     return updated_rider
 
 @router.delete("/riders/{rider_id}")
@@ -526,4 +634,174 @@ def delete_rider_endpoint(rider_id: int, current_user: dict = Depends(get_curren
     if not success:
         raise HTTPException(status_code=404, detail="Rider not found")
     
-    return {"message": "Rider deleted successfully"}
\ No newline at end of file
+    return {"message": "Rider deleted successfully"}
+
+def _bulk_selection(selection: RiderBulkSelection) -> dict:
+    if (selection.ids is None) == (selection.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    if selection.filter is not None:
+        criteria = selection.filter.dict(exclude_none=True)
+        if not criteria:
+            raise HTTPException(status_code=400, detail="filter needs at least one of status, search, created_by")
+        return criteria
+    return {"ids": selection.ids}
+
+def _bulk_response(results: list) -> dict:
+    return {"results": results, "counts": dict(Counter(result["outcome"] for result in results))}
+
+@router.post("/riders/bulk/status", response_model=RiderBulkResponse)
+def bulk_change_rider_status(
+    request: RiderBulkStatusRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Set the status of many riders at once, selected by ids or by filter, in one transaction.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    try:
+        results = bulk_update_rider_status(db, request.status, **_bulk_selection(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _bulk_response(results)
+
+@router.post("/riders/bulk/delete", response_model=RiderBulkResponse)
+def bulk_delete_riders_endpoint(
+    request: RiderBulkSelection,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete many riders at once, selected by ids or by filter, in one transaction.
+    Their documents are removed by the file collector once the deletion commits.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    try:
+        results = bulk_delete_riders(db, **_bulk_selection(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _bulk_response(results)
+
+@router.post("/dispatch", response_model=DispatchResponse)
+def request_dispatch(
+    request: DispatchRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the k nearest available riders to a pickup point from the in-memory rider index.
+    With assign=true the nearest one is reserved (marked busy) and returned as 'assigned'.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    assigned = None
+    if request.assign:
+        assigned = dispatch_nearest_rider(db, request.pickup_latitude, request.pickup_longitude, request.max_distance_km)
+        if not assigned:
+            raise HTTPException(status_code=404, detail="No available rider near pickup")
+    candidates = find_nearest_riders(request.pickup_latitude, request.pickup_longitude, request.k, request.max_distance_km)
+    return {"candidates": candidates, "assigned": assigned}
+
+@router.post("/routes/plan", response_model=RoutePlanResponse)
+def plan_rider_routes(
+    request: RoutePlanRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Propose a visit order for each rider's pickups and dropoffs (pickups always before
+    their dropoffs), optionally splitting pending orders between riders first.
+    This is a plan only; assign orders through the status endpoint to act on it.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return plan_routes(db, request.rider_ids, request.assign_pending,
+                       request.max_orders_per_rider, request.time_budget_ms)
+
+@router.put("/orders/{reference}/status", response_model=OrderResponse)
+def change_order_status(
+    reference: str,
+    update: OrderStatusUpdate,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Move an order through pending -> assigned -> picked_up -> in_transit -> delivered (or cancelled).
+    Assigning requires rider_id.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    try:
+        order = update_order_status(db, reference, update.status, update.rider_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+def _read_snapshot(viewport):
+    with ReadSessionLocal() as db:
+        return load_snapshot(db, viewport)
+
+@router.websocket("/live/riders")
+async def live_rider_positions(websocket: WebSocket, viewport: Optional[str] = None):
+    """
+    Push rider position and availability changes to an admin dashboard.
+    The optional viewport query parameter is "min_lat,min_lon,max_lat,max_lon";
+    the client can move it by sending {"viewport": [min_lat, min_lon, max_lat, max_lon]}
+    (or null for every rider), which is acknowledged with {"type": "viewport", ...}
+    before the new area's snapshot. Each frame is {"type": "riders", "riders": [...]} holding
+    the latest state of riders that changed since the last frame.
+    """
+    try:
+        current_user = get_current_user(websocket)
+        if current_user["role"] not in ["admin", "super_admin"]:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        bounds = parse_viewport(viewport.split(",")) if viewport else None
+    except (HTTPException, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = rider_feed.subscribe(bounds)
+    subscriber.prime(await run_in_threadpool(_read_snapshot, bounds))
+
+    async def receive_viewports():
+        try:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                    bounds = parse_viewport(message.get("viewport"))
+                except (ValueError, TypeError, AttributeError) as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                # The dashboard clears its markers on this ack; the new viewport's snapshot follows
+                await websocket.send_json({"type": "viewport", "viewport": list(bounds) if bounds else None})
+                subscriber.viewport = bounds
+                subscriber.visible = set()
+                subscriber.prime(await run_in_threadpool(_read_snapshot, bounds))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            subscriber.close()
+
+    receiver = asyncio.create_task(receive_viewports())
+    try:
+        while True:
+            frame = await subscriber.next_frame()
+            if frame is None:
+                break
+            await websocket.send_text(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        rider_feed.unsubscribe(subscriber)
+        if subscriber.dropped:
+            print(f"Live feed: dashboard disconnected, {subscriber.dropped} superseded updates skipped")
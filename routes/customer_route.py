@@ -1,5 +1,14 @@
+import asyncio
+import queue
+from datetime import datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database import get_db
 from utils.auth_middleware import get_current_user
+from utils.serialization import FastJSONResponse
+from schemas.order_schema import OrderCreate, OrderAccepted, OrderResponse
+from services.order_service import order_ingestor, build_order_row, get_customer_orders
 
 router = APIRouter()
 
@@ -8,3 +17,42 @@ def customer_dashboard(user=Depends(get_current_user)):
     if user["role"] != "customer":
         raise HTTPException(status_code=403, detail="Access denied")
     return {"message": "Welcome to Customer Dashboard"}
+
+@router.post("/orders", response_model=OrderAccepted, status_code=201,
+             responses={202: {"model": OrderAccepted, "description": "Queued; not yet confirmed as stored"}})
+async def create_order(order: OrderCreate, user=Depends(get_current_user)):
+    """
+    Place a delivery order. Orders are written in batches by the order ingestor;
+    this waits only for the batch containing this order to be flushed. If that
+    takes too long the order stays queued and 202 is returned with its
+    reference; check GET /orders rather than resubmitting.
+    """
+    if user["role"] != "customer":
+        raise HTTPException(status_code=403, detail="Access denied")
+    row = build_order_row(user["user_id"], order.dict())
+    try:
+        future = order_ingestor.submit(row)
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Order intake is busy, please retry")
+    try:
+        row = await asyncio.wait_for(asyncio.wrap_future(future), timeout=10)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        accepted = OrderAccepted(reference=row["reference"], status="queued", created_at=row["created_at"])
+        return FastJSONResponse(accepted.model_dump(mode="json"), status_code=202)
+    return row
+
+@router.get("/orders", response_model=List[OrderResponse])
+def list_orders(
+    before: Optional[datetime] = None,
+    limit: int = 20,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Newest-first order history; pass the last created_at as `before` for the next page."""
+    if user["role"] != "customer":
+        raise HTTPException(status_code=403, detail="Access denied")
+    if limit <= 0 or limit > 100:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
+    return get_customer_orders(db, user["user_id"], before, limit)
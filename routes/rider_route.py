@@ -4,7 +4,13 @@ from database import get_db
 from utils.auth_middleware import get_current_user
 from models import Rider, ResetToken
 from utils.security import hash_password
+from schemas.rider_schema import RiderLocationUpdate, RiderLocationResponse, RiderLocationBatch, RiderLocationBatchResponse
+from schemas.order_schema import OrderResponse
+from services.dispatch_service import update_rider_position
+from services.order_service import get_rider_orders
+from services.location_service import location_ingestor
 from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter(tags=["Rider"])
 
@@ -14,6 +20,45 @@ def rider_dashboard(user=Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Access denied")
     return {"message": "Welcome to Rider Dashboard"}
 
+@router.put("/location", response_model=RiderLocationResponse)
+def update_location(
+    location: RiderLocationUpdate,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if user["role"] != "rider":
+        raise HTTPException(status_code=403, detail="Access denied")
+    try:
+        result = update_rider_position(db, user["user_id"], location.latitude, location.longitude, location.availability)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not result:
+        raise HTTPException(status_code=404, detail="Rider not found")
+    return result
+
+@router.post("/locations", response_model=RiderLocationBatchResponse, status_code=202)
+def report_locations(batch: RiderLocationBatch, user=Depends(get_current_user)):
+    """
+    Accept a batch of timestamped GPS points. The newest point becomes the rider's
+    live position immediately; the trail is written to the database in bulk.
+    """
+    if user["role"] != "rider":
+        raise HTTPException(status_code=403, detail="Access denied")
+    points = [(p.latitude, p.longitude, p.recorded_at) for p in batch.points]
+    accepted = location_ingestor.ingest(user["user_id"], points)
+    return {"accepted": accepted, "rejected": len(points) - accepted}
+
+@router.get("/orders", response_model=List[OrderResponse])
+def list_assigned_orders(
+    status: Optional[str] = None,
+    user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Orders assigned to the rider; defaults to those still in progress."""
+    if user["role"] != "rider":
+        raise HTTPException(status_code=403, detail="Access denied")
+    return get_rider_orders(db, user["user_id"], status)
+
 @router.post("/reset-password")
 async def reset_password(
     token: str = Form(...),
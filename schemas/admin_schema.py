@@ -1,5 +1,6 @@
 import email
-from pydantic import BaseModel, EmailStr
+from functools import lru_cache
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, ConfigDict, create_model
 from datetime import datetime
 from typing import Optional, List
 
@@ -41,6 +42,8 @@ class IssueResponse(BaseModel):
     urgency: bool
     timestamp: datetime
     status: str
+    occurrences: int = 1
+    last_seen: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -69,10 +72,18 @@ class FeedbackResponse(BaseModel):
     status: str  
     rating: int  
     timestamp: datetime
+    urgency: bool = False
 
     class Config:
         from_attributes = True
 
+class FeedbackAcceptedResponse(BaseModel):
+    submission_id: str
+    status: str  # "queued": acknowledged, written to the database shortly
+
+class FeedbackSearchResult(FeedbackResponse):
+    score: float  # engine relevance; only comparable within one search
+
 class DeleteAccountResponse(BaseModel):
     message: str
 
@@ -86,6 +97,11 @@ class AdminListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PaginatedAdminResponse(BaseModel):
+    admins: List[AdminListResponse]
+    limit: int
+    next_cursor: Optional[int] = None  # pass as `after` for the next page; None on the last page
+
 # Refined schemas for rider management
 class RiderResponse(BaseModel):
     id: int
@@ -125,6 +141,27 @@ class RiderUpdate(BaseModel):
 class RiderUpdateResponse(RiderResponse):
     pass
 
+class RiderBulkFilter(BaseModel):
+    status: Optional[str] = None
+    search: Optional[str] = None  # first or last name prefix, as on GET /riders
+    created_by: Optional[int] = None
+
+class RiderBulkSelection(BaseModel):
+    # Exactly one of ids or filter
+    ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=5000)
+    filter: Optional[RiderBulkFilter] = None
+
+class RiderBulkStatusRequest(RiderBulkSelection):
+    status: str
+
+class RiderBulkOutcome(BaseModel):
+    id: int
+    outcome: str  # updated, unchanged, deleted, has_orders or not_found
+
+class RiderBulkResponse(BaseModel):
+    results: List[RiderBulkOutcome]
+    counts: dict
+
 class PaginatedRiderResponse(BaseModel):
     total: int
     skip: int
@@ -132,4 +169,96 @@ class PaginatedRiderResponse(BaseModel):
     riders: List[RiderResponse]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DispatchRequest(BaseModel):
+    pickup_latitude: float = Field(ge=-90, le=90)
+    pickup_longitude: float = Field(ge=-180, le=180)
+    k: int = Field(default=5, ge=1, le=50)
+    max_distance_km: Optional[float] = Field(default=None, gt=0)
+    assign: bool = False  # reserve the nearest rider by marking them busy
+
+class DispatchCandidate(BaseModel):
+    rider_id: int
+    distance_km: float
+    latitude: float
+    longitude: float
+
+class DispatchResponse(BaseModel):
+    candidates: List[DispatchCandidate]
+    assigned: Optional[DispatchCandidate] = None
+
+class AdminDashboardMessage(BaseModel):
+    message: str
+
+class AdminOverviewResponse(BaseModel):
+    dashboard: AdminDashboardMessage
+    profile: AdminProfileResponse
+    preferences: AdminPreferencesResponse
+    priorities: Optional[List[IssueResponse]] = None
+    notifications: Optional[List[IssueResponse]] = None
+    top_regions: Optional[List[TopRegionResponse]] = None
+    unavailable: List[str]  # sections that failed to load and are null
+
+class RoutePlanRequest(BaseModel):
+    rider_ids: Optional[List[int]] = None  # defaults to every active rider who isn't offline
+    assign_pending: bool = False  # also split unassigned orders between the riders
+    max_orders_per_rider: int = Field(default=10, ge=1, le=100)
+    time_budget_ms: int = Field(default=50, ge=1, le=2000)
+
+class RouteStop(BaseModel):
+    order_reference: str
+    kind: str  # "pickup" or "dropoff"
+    latitude: float
+    longitude: float
+    distance_km: float  # cumulative from the rider's position
+
+class RiderRoute(BaseModel):
+    rider_id: int
+    start_latitude: float
+    start_longitude: float
+    total_distance_km: float
+    stops: List[RouteStop]
+
+class RoutePlanResponse(BaseModel):
+    routes: List[RiderRoute]
+    unassigned: List[str]
+    elapsed_ms: float
+
+# Prebuilt adapters for list endpoints that serialize rows directly
+IssueListAdapter = TypeAdapter(List[IssueResponse])
+FeedbackListAdapter = TypeAdapter(List[FeedbackResponse])
+FeedbackSearchAdapter = TypeAdapter(List[FeedbackSearchResult])
+PaginatedAdminAdapter = TypeAdapter(PaginatedAdminResponse)
+TopRegionListAdapter = TypeAdapter(List[TopRegionResponse])
+PaginatedRiderAdapter = TypeAdapter(PaginatedRiderResponse)
+
+# Sparse fieldsets for rider reads (?fields=id,name,status)
+RIDER_FIELDS = tuple(RiderResponse.model_fields)
+
+def parse_rider_fields(fields: Optional[str]) -> tuple:
+    """Turn a comma-separated fields parameter into a canonical tuple; id is always included."""
+    if not fields:
+        return RIDER_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(RIDER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown rider fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(f for f in RIDER_FIELDS if f in requested)
+
+@lru_cache(maxsize=128)
+def rider_fields_adapters(fields: tuple) -> tuple:
+    """(single, paginated) adapters for a rider fieldset, built once per distinct fieldset."""
+    if fields == RIDER_FIELDS:
+        return TypeAdapter(RiderResponse), PaginatedRiderAdapter
+    rider_model = create_model(
+        "RiderFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (RiderResponse.model_fields[name].annotation, ...) for name in fields},
+    )
+    page_model = create_model(
+        "PaginatedRiderFields",
+        total=(int, ...), skip=(int, ...), limit=(int, ...), riders=(List[rider_model], ...),
+    )
+    return TypeAdapter(rider_model), TypeAdapter(page_model)
@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class OrderCreate(BaseModel):
+    pickup_address: str = Field(max_length=255)
+    dropoff_address: str = Field(max_length=255)
+    pickup_latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    pickup_longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    dropoff_latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    dropoff_longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    package_description: Optional[str] = Field(default=None, max_length=255)
+    agent_id: Optional[int] = None
+
+class OrderAccepted(BaseModel):
+    reference: str
+    status: str
+    created_at: datetime
+
+class OrderResponse(BaseModel):
+    id: int
+    reference: str
+    customer_id: int
+    rider_id: Optional[int] = None
+    agent_id: Optional[int] = None
+    pickup_address: str
+    pickup_latitude: Optional[float] = None
+    pickup_longitude: Optional[float] = None
+    dropoff_address: str
+    dropoff_latitude: Optional[float] = None
+    dropoff_longitude: Optional[float] = None
+    package_description: Optional[str] = None
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class OrderStatusUpdate(BaseModel):
+    status: str
+    rider_id: Optional[int] = None
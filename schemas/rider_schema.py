@@ -1,7 +1,33 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+from typing import Optional, List
 
 class RiderCreate(BaseModel):
     name: str
     email: EmailStr
     password: str
     bike_number: str
+
+class RiderLocationUpdate(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    availability: Optional[str] = None  # "available", "busy" or "offline"
+
+class RiderLocationResponse(BaseModel):
+    rider_id: int
+    latitude: float
+    longitude: float
+    availability: str
+    last_seen_at: datetime
+
+class RiderLocationPoint(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    recorded_at: datetime
+
+class RiderLocationBatch(BaseModel):
+    points: List[RiderLocationPoint] = Field(min_length=1, max_length=500)
+
+class RiderLocationBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
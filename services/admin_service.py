@@ -1,13 +1,20 @@
 from sqlalchemy.orm import Session
-from models import Admin, Issue, Feedback, VerificationCode, Rider, ResetToken
-from schemas.admin_schema import AdminCreate
+from models import Admin, Issue, Feedback, VerificationCode, Rider, ResetToken, RiderLocation, Order
+from schemas.admin_schema import AdminCreate, AdminListResponse, IssueResponse, FeedbackResponse, RIDER_FIELDS
+from utils.serialization import schema_columns
+from services.dispatch_service import rider_index
+from services.live_service import rider_feed
+from services.file_service import schedule_file_deletion
+from services.issue_service import issue_fingerprint, coalesce_issue, remember_issue
+from services.feedback_service import apply_feedback_filters, build_feedback_row, feedback_classifier
 from utils.security import hash_password
 import os
-from fastapi import UploadFile
+from fastapi import UploadFile, HTTPException
 import time
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import or_
+from sqlalchemy import or_, func
+from sqlalchemy.orm.exc import StaleDataError
 
 def create_admin(db: Session, admin_data: AdminCreate):
     """Create a new admin."""
@@ -22,27 +29,28 @@ def create_admin(db: Session, admin_data: AdminCreate):
     db.refresh(new_admin)
     return new_admin
 
-def get_admins(db: Session):
-    """Retrieve all admins with a display_id for gap-free numbering."""
-    admins = db.query(Admin).all()
-    return [
-        {
-            "display_id": index + 1,
-            "id": admin.id,
-            "name": admin.name,
-            "email": admin.email,
-            "profile_picture": admin.profile_picture
-        }
-        for index, admin in enumerate(admins)
-    ]
-
-def get_admin_profile(db: Session, user_id: int):
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if not admin:
-        return None
-    return admin
+def get_admins(db: Session, after: Optional[int] = None, limit: int = 50):
+    """
+    One page of the admin directory in id order, starting after the admin id
+    `after`. display_id is gap-free numbering computed in SQL: row_number()
+    over the page, offset by an index-only count of the admins before it.
+    Returns the rows and the cursor for the next page (None on the last).
+    """
+    page = db.query(*schema_columns(Admin, AdminListResponse))
+    if after is not None:
+        page = page.filter(Admin.id > after)
+    # Number only the fetched page, so the window never runs over the rest of the table
+    page = page.order_by(Admin.id).limit(limit + 1).subquery()
+    display_id = func.row_number().over(order_by=page.c.id)
+    if after is not None:
+        display_id = display_id + db.query(func.count(Admin.id)).filter(Admin.id <= after).scalar_subquery()
+    rows = db.query(display_id.label("display_id"), *page.c).order_by(page.c.id).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return {"admins": rows[:limit], "next_cursor": next_cursor}
 
-def update_admin_profile_picture(db: Session, user_id: int, file: UploadFile):
+def update_admin_profile_picture(db: Session, admin: Admin, file: UploadFile):
+    """Save a new profile picture for an already loaded admin; the caller commits."""
+    user_id = admin.id
     print(f"Processing file upload for admin_id={user_id}, filename={file.filename}, content_type={file.content_type}")
     
     static_dir = "static/images"
@@ -66,13 +74,8 @@ def update_admin_profile_picture(db: Session, user_id: int, file: UploadFile):
     profile_picture_url = f"/static/images/{filename}"
     print(f"Generated profile_picture_url: {profile_picture_url}")
     
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if not admin:
-        print(f"Admin not found for admin_id={user_id}")
-        return None
+    schedule_file_deletion(db, admin.profile_picture)
     admin.profile_picture = profile_picture_url
-    db.commit()
-    db.refresh(admin)
     print(f"Updated admin profile_picture to: {admin.profile_picture}")
     
     return profile_picture_url
@@ -94,81 +97,75 @@ def create_issue(
         is_rider_unavailable
     )
     
+    # Repeats of an open issue (an outage reporting the same failure) bump its count instead of adding rows
+    fingerprint = issue_fingerprint(description, delay_minutes > 30, has_direct_customer_impact,
+                                    is_critical_system_failure, is_high_priority_complaint, is_rider_unavailable)
+    now = datetime.utcnow()
+    issue_id = coalesce_issue(db, fingerprint, now)
+    if issue_id:
+        db.commit()
+        return db.get(Issue, issue_id)
+
     new_issue = Issue(
         description=description,
         urgency=is_urgent,
-        timestamp=datetime.utcnow(),
-        status="open"
+        timestamp=now,
+        status="open",
+        fingerprint=fingerprint,
+        occurrences=1,
+        last_seen=now
     )
     db.add(new_issue)
     db.commit()
     db.refresh(new_issue)
+    remember_issue(new_issue)
     return new_issue
 
 def get_urgent_issues(db: Session):
-    return db.query(Issue).filter(Issue.urgency == True).all()
+    return db.query(*schema_columns(Issue, IssueResponse)).filter(Issue.urgency == True).all()
 
 def get_non_urgent_issues(db: Session):
-    return db.query(Issue).filter(Issue.urgency == False).all()
+    return db.query(*schema_columns(Issue, IssueResponse)).filter(Issue.urgency == False).all()
 
-def get_admin_preferences(db: Session, user_id: int):
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if not admin:
-        return None
+def get_admin_preferences(admin: Admin):
     return admin.preferences or {"theme": "light", "notifications": True}
 
-def update_admin_preferences(db: Session, user_id: int, preferences: dict):
-    admin = db.query(Admin).filter(Admin.id == user_id).first()
-    if not admin:
-        return None
+def update_admin_preferences(db: Session, admin: Admin, preferences: dict):
     admin.preferences = preferences
     db.commit()
-    db.refresh(admin)
-    return admin.preferences
+    return preferences
+
+# Nairobi delivery regions and their success rates
+REGION_SUCCESS_RATES = [
+    {"region": "Westlands", "success_rate": 95.5},
+    {"region": "Embakasi", "success_rate": 92.0},
+    {"region": "Kasarani", "success_rate": 88.7},
+    {"region": "Lang'ata", "success_rate": 85.3},
+    {"region": "Dagoretti", "success_rate": 80.1},
+    {"region": "Starehe", "success_rate": 78.6},
+    {"region": "Kamukunji", "success_rate": 76.2},
+    {"region": "Makadara", "success_rate": 74.8},
+    {"region": "Ruaraka", "success_rate": 73.4},
+    {"region": "Mathare", "success_rate": 71.9}
+]
 
 def get_top_regions(db: Session):
-    all_regions = [
-        {"region": "Westlands", "success_rate": 95.5},
-        {"region": "Embakasi", "success_rate": 92.0},
-        {"region": "Kasarani", "success_rate": 88.7},
-        {"region": "Lang'ata", "success_rate": 85.3},
-        {"region": "Dagoretti", "success_rate": 80.1},
-        {"region": "Starehe", "success_rate": 78.6},
-        {"region": "Kamukunji", "success_rate": 76.2},
-        {"region": "Makadara", "success_rate": 74.8},
-        {"region": "Ruaraka", "success_rate": 73.4},
-        {"region": "Mathare", "success_rate": 71.9}
-    ]
-    sorted_regions = sorted(all_regions, key=lambda x: x["success_rate"], reverse=True)
+    sorted_regions = sorted(REGION_SUCCESS_RATES, key=lambda x: x["success_rate"], reverse=True)
     return sorted_regions[:5]
 
 def create_feedback(db: Session, user_id: int, user_type: str, message: str):
-    feedback = Feedback(
-        user_id=user_id,
-        user_type=user_type,
-        message=message,
-        region="Unknown",
-        category="General",
-        status="Pending",
-        rating=0
-    )
+    feedback = Feedback(**build_feedback_row(user_id, user_type, message))
     db.add(feedback)
     db.commit()
     db.refresh(feedback)
+    # Category, region and urgency are filled in by the background classifier
+    feedback_classifier.wake()
     return feedback
 
 def get_feedbacks(db: Session, region: Optional[str] = None, date_start: Optional[datetime] = None, 
                  date_end: Optional[datetime] = None, sort_by: str = "date", 
                  sort_order: str = "desc"):
-    query = db.query(Feedback)
-    if region:
-        query = query.filter(Feedback.region.ilike(f"{region}%"))
-    if date_start and date_end:
-        query = query.filter(Feedback.timestamp.between(date_start, date_end))
-    elif date_start:
-        query = query.filter(Feedback.timestamp >= date_start)
-    elif date_end:
-        query = query.filter(Feedback.timestamp <= date_end)
+    query = apply_feedback_filters(db.query(*schema_columns(Feedback, FeedbackResponse)), region, date_start, date_end)
     valid_sort_by = {"date", "rating"}
     if sort_by not in valid_sort_by:
         sort_by = "date"
@@ -194,61 +191,63 @@ def delete_admin_account(db: Session, user_id: int):
         print(f"Deleted {verification_codes_deleted} verification code records for admin_id={user_id}")
         feedback_deleted = db.query(Feedback).filter(Feedback.user_id == user_id, Feedback.user_type == "admin").delete()
         print(f"Deleted {feedback_deleted} feedback records for admin_id={user_id}")
-        if admin.profile_picture:
-            file_path = admin.profile_picture.lstrip("/")
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    print(f"Deleted profile picture: {file_path}")
-                else:
-                    print(f"Profile picture file not found: {file_path}")
-            except Exception as e:
-                print(f"Error deleting profile picture {file_path}: {e}")
+        schedule_file_deletion(db, admin.profile_picture)
         db.delete(admin)
         print(f"Deleted admin record: id={admin.id}, name={admin.name}, email={admin.email}")
         print(f"Committed deletion for admin_id={user_id}")
     return user_id
 
-def get_riders(db: Session, search: Optional[str] = None, skip: int = 0, limit: int = 10) -> dict:
+def rider_name_filter(search: str):
+    search = search.strip()
+    return or_(
+        Rider.name.ilike(f"{search}% %"),  # Matches first_name
+        Rider.name.ilike(f"% {search}%")   # Matches last_name
+    )
+
+def get_riders(db: Session, search: Optional[str] = None, skip: int = 0, limit: int = 10,
+               fields: tuple = RIDER_FIELDS) -> dict:
     """
     Fetch paginated riders with optional filtering by first_name or last_name.
+    Only the requested fields are selected; rows come back as tuples.
     Returns a dictionary with 'riders' list and 'total' count.
     """
     print(f"Fetching riders with search: {search}, skip: {skip}, limit: {limit}")
-    query = db.query(Rider)
+    query = db.query(*[getattr(Rider, name) for name in fields])
+    count_query = db.query(func.count(Rider.id))
     
     # Apply search filter if provided
     if search:
-        search = search.strip()
-        query = query.filter(
-            or_(
-                Rider.name.ilike(f"{search}% %"),  # Matches first_name
-                Rider.name.ilike(f"% {search}%")   # Matches last_name
-            )
-        )
+        name_filter = rider_name_filter(search)
+        query = query.filter(name_filter)
+        count_query = count_query.filter(name_filter)
     
     # Get total count (including search filter)
-    total = query.count()
+    total = count_query.scalar()
     print(f"Total riders found: {total}")
     
     # Apply pagination
-    riders = query.offset(skip).limit(limit).all()
+    riders = query.order_by(Rider.id).offset(skip).limit(limit).all()
     print(f"Returned {len(riders)} riders")
     
     return {"riders": riders, "total": total}
 
-def get_rider_by_id(db: Session, rider_id: int) -> Optional[Rider]:
+def get_rider_by_id(db: Session, rider_id: int, fields: tuple = RIDER_FIELDS):
     """
-    Fetch a single rider by ID.
+    Fetch a single rider by ID, selecting only the requested fields.
     """
     print(f"Fetching rider with ID: {rider_id}")
-    rider = db.query(Rider).filter(Rider.id == rider_id).first()
+    # version rides along for the ETag; response schemas ignore it
+    rider = db.query(*[getattr(Rider, name) for name in fields], Rider.version).filter(Rider.id == rider_id).first()
     if rider:
-        print(f"Rider found: {rider.name}")
+        print(f"Rider found: {rider.id}")
     else:
         print(f"Rider with ID {rider_id} not found")
     return rider
 
+def get_rider_version(db: Session, rider_id: int) -> Optional[int]:
+    """Cheap lookup of a rider's row version for conditional requests."""
+    return db.query(Rider.version).filter(Rider.id == rider_id).scalar()
+
 def update_rider_file(rider_id: int, file: UploadFile, file_type: str) -> str:
     """
     Helper function to save rider files (driving_license, insurance).
@@ -277,15 +276,20 @@ def update_rider_file(rider_id: int, file: UploadFile, file_type: str) -> str:
     print(f"Generated file_url: {file_url}")
     return file_url
 
-def update_rider(db: Session, rider_id: int, update_data: dict, driving_license: Optional[UploadFile] = None, insurance: Optional[UploadFile] = None) -> Optional[Rider]:
+def update_rider(db: Session, rider_id: int, update_data: dict, driving_license: Optional[UploadFile] = None, insurance: Optional[UploadFile] = None,
+                 expected_version: Optional[int] = None) -> Optional[Rider]:
     """
     Update an existing rider's details and optionally replace driving license and insurance files.
+    When expected_version is given (from If-Match), the update only proceeds if the rider is still at that version.
     """
     print(f"Updating rider with ID: {rider_id}")
     rider = db.query(Rider).filter(Rider.id == rider_id).first()
     if not rider:
         print(f"Rider with ID {rider_id} not found")
         return None
+    if expected_version is not None and rider.version != expected_version:
+        print(f"Rider {rider_id} is at version {rider.version}, client expected {expected_version}")
+        raise HTTPException(status_code=412, detail="Rider was modified by another request")
 
     first_name = update_data.pop("first_name", None)
     last_name = update_data.pop("last_name", None)
@@ -310,14 +314,7 @@ def update_rider(db: Session, rider_id: int, update_data: dict, driving_license:
         print(f"Received driving_license: {driving_license.filename}, content_type: {driving_license.content_type}")
         if driving_license.content_type != "application/pdf":
             raise ValueError(f"Invalid content type for driving_license: {driving_license.content_type}. Only PDFs are allowed")
-        if rider.driving_license:
-            old_file_path = rider.driving_license.lstrip("/")
-            try:
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-                    print(f"Deleted old driving_license: {old_file_path}")
-            except Exception as e:
-                print(f"Error deleting old driving_license {old_file_path}: {e}")
+        schedule_file_deletion(db, rider.driving_license)
         driving_license_path = update_rider_file(rider_id, driving_license, "driving_license")
         rider.driving_license = driving_license_path
         print(f"Updated driving_license to: {driving_license_path}")
@@ -326,19 +323,16 @@ def update_rider(db: Session, rider_id: int, update_data: dict, driving_license:
         print(f"Received insurance: {insurance.filename}, content_type: {insurance.content_type}")
         if insurance.content_type != "application/pdf":
             raise ValueError(f"Invalid content type for insurance: {insurance.content_type}. Only PDFs are allowed")
-        if rider.insurance:
-            old_file_path = rider.insurance.lstrip("/")
-            try:
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-                    print(f"Deleted old insurance: {old_file_path}")
-            except Exception as e:
-                print(f"Error deleting old insurance {old_file_path}: {e}")
+        schedule_file_deletion(db, rider.insurance)
         insurance_path = update_rider_file(rider_id, insurance, "insurance")
         rider.insurance = insurance_path
         print(f"Updated insurance to: {insurance_path}")
 
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=412, detail="Rider was modified by another request")
     db.refresh(rider)
     print(f"Rider updated: {rider.name}")
     return rider
@@ -346,27 +340,116 @@ def update_rider(db: Session, rider_id: int, update_data: dict, driving_license:
 def delete_rider(db: Session, rider_id: int) -> bool:
     """
     Delete a rider by ID and associated files.
+    Riders referenced by orders are kept (409), as in bulk_delete_riders.
     """
     print(f"Deleting rider with ID: {rider_id}")
     rider = db.query(Rider).filter(Rider.id == rider_id).first()
     if not rider:
         print(f"Rider with ID {rider_id} not found")
         return False
+    if db.query(Order.id).filter(Order.rider_id == rider_id).first():
+        raise HTTPException(status_code=409, detail="Rider has orders and cannot be deleted; suspend them instead")
 
-    for file_field in [rider.id_document, rider.driving_license, rider.insurance]:
-        if file_field:
-            file_path = file_field.lstrip("/")
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    print(f"Deleted file: {file_path}")
-            except Exception as e:
-                print(f"Error deleting file {file_path}: {e}")
+    schedule_file_deletion(db, rider.id_document, rider.driving_license, rider.insurance)
 
     reset_tokens_deleted = db.query(ResetToken).filter(ResetToken.rider_id == rider_id).delete()
     print(f"Deleted {reset_tokens_deleted} reset tokens for rider_id={rider_id}")
+    db.query(RiderLocation).filter(RiderLocation.rider_id == rider_id).delete(synchronize_session=False)
 
     db.delete(rider)
     db.commit()
+    rider_index.remove(rider_id)
+    rider_feed.remove(rider_id)
     print(f"Rider with ID {rider_id} deleted successfully")
-    return True
\ No newline at end of file
+    return True
+
+RIDER_STATUSES = {"active", "suspended", "inactive"}
+# Most riders one bulk request may touch, whether selected by ids or by filter
+BULK_RIDER_LIMIT = 5000
+
+def _select_bulk_riders(db: Session, columns: list, ids: Optional[List[int]] = None, status: Optional[str] = None,
+                        search: Optional[str] = None, created_by: Optional[int] = None) -> list:
+    query = db.query(Rider.id, *columns)
+    if ids is not None:
+        query = query.filter(Rider.id.in_(ids))
+    if status:
+        query = query.filter(Rider.status == status)
+    if search:
+        query = query.filter(rider_name_filter(search))
+    if created_by:
+        query = query.filter(Rider.created_by == created_by)
+    rows = query.order_by(Rider.id).limit(BULK_RIDER_LIMIT + 1).all()
+    if len(rows) > BULK_RIDER_LIMIT:
+        raise ValueError(f"More than {BULK_RIDER_LIMIT} riders match; narrow the selection")
+    return rows
+
+def _missing_outcomes(ids: Optional[List[int]], found) -> List[dict]:
+    if ids is None:
+        return []
+    return [{"id": rider_id, "outcome": "not_found"} for rider_id in dict.fromkeys(ids) if rider_id not in found]
+
+def bulk_update_rider_status(db: Session, new_status: str, ids: Optional[List[int]] = None, **filters) -> List[dict]:
+    """
+    Set the status of every selected rider with one UPDATE in one transaction.
+    The UPDATE bypasses the ORM, so the row version is bumped explicitly to keep ETags honest.
+    Returns an outcome per rider: updated, unchanged or not_found.
+    """
+    if new_status not in RIDER_STATUSES:
+        raise ValueError(f"Invalid status: {new_status}. Must be one of {sorted(RIDER_STATUSES)}")
+    rows = _select_bulk_riders(db, [Rider.status], ids, **filters)
+    current = {row.id: row.status for row in rows}
+    changing = [rider_id for rider_id, status in current.items() if status != new_status]
+    print(f"Bulk status change to '{new_status}': {len(changing)} of {len(current)} riders")
+
+    if changing:
+        db.query(Rider).filter(Rider.id.in_(changing), Rider.status != new_status).update(
+            {Rider.status: new_status, Rider.version: Rider.version + 1}, synchronize_session=False)
+        db.commit()
+        if new_status == "active":
+            positions = db.query(Rider.id, Rider.last_latitude, Rider.last_longitude).filter(
+                Rider.id.in_(changing),
+                Rider.availability == "available",
+                Rider.last_latitude.isnot(None),
+                Rider.last_longitude.isnot(None),
+            ).all()
+            for rider_id, lat, lon in positions:
+                rider_index.update(rider_id, lat, lon)
+        else:
+            for rider_id in changing:
+                rider_index.remove(rider_id)
+        for rider_id in changing:
+            rider_feed.publish(rider_id, status=new_status)
+
+    return _missing_outcomes(ids, current) + [
+        {"id": rider_id, "outcome": "updated" if status != new_status else "unchanged"}
+        for rider_id, status in current.items()
+    ]
+
+def bulk_delete_riders(db: Session, ids: Optional[List[int]] = None, **filters) -> List[dict]:
+    """
+    Delete every selected rider, with their reset tokens and location trail, in one transaction.
+    Riders referenced by orders are kept and reported as has_orders; documents
+    are queued for removal in the same transaction.
+    """
+    rows = _select_bulk_riders(db, [Rider.id_document, Rider.driving_license, Rider.insurance], ids, **filters)
+    found = {row.id: row for row in rows}
+    with_orders = {rider_id for (rider_id,) in
+                   db.query(Order.rider_id).filter(Order.rider_id.in_(list(found))).distinct()} if found else set()
+    deleting = [rider_id for rider_id in found if rider_id not in with_orders]
+    print(f"Bulk delete: {len(deleting)} of {len(found)} riders ({len(with_orders)} have orders)")
+
+    if deleting:
+        db.query(ResetToken).filter(ResetToken.rider_id.in_(deleting)).delete(synchronize_session=False)
+        db.query(RiderLocation).filter(RiderLocation.rider_id.in_(deleting)).delete(synchronize_session=False)
+        db.query(Rider).filter(Rider.id.in_(deleting)).delete(synchronize_session=False)
+        schedule_file_deletion(db, *(path for rider_id in deleting for path in
+                                     (found[rider_id].id_document, found[rider_id].driving_license, found[rider_id].insurance)))
+        db.commit()
+        for rider_id in deleting:
+            rider_index.remove(rider_id)
+            rider_feed.remove(rider_id)
+
+    return _missing_outcomes(ids, found) + [
+        {"id": rider_id, "outcome": "has_orders" if rider_id in with_orders else "deleted"}
+        for rider_id in found
+    ]
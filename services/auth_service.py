@@ -2,26 +2,40 @@ import os
 from sqlalchemy.orm import Session
 from models import Admin, Rider, Agent, Customer, ResetToken
 from schemas.auth_schema import AuthLogin, UserRegistration, UserResponse, RiderRegistration
-from utils.security import hash_password, verify_password, generate_random_password
+from utils.security import hash_password, verify_and_rehash, generate_random_password
 from utils.email_service import send_welcome_email
 from fastapi import HTTPException
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime, timedelta
 
+def _password_matches(db: Session, user, password: str) -> bool:
+    """Check a login password, upgrading the stored hash when the hashing scheme or cost has changed."""
+    matches, new_hash = verify_and_rehash(password, user.password)
+    if matches and new_hash:
+        user.password = new_hash
+        try:
+            db.commit()
+            print(f"Rehashed password for {type(user).__name__.lower()} id={user.id}")
+        except StaleDataError:
+            # Changed concurrently (e.g. a password reset); keep whatever was stored
+            db.rollback()
+    return matches
+
 def authenticate_user(db: Session, request: AuthLogin):
     admin = db.query(Admin).filter(Admin.email == request.email).first()
-    if admin and verify_password(request.password, admin.password):
+    if admin and _password_matches(db, admin, request.password):
         return {"user_id": admin.id, "role": admin.role}  # Use admin.role instead of hardcoding "admin"
     
     rider = db.query(Rider).filter(Rider.email == request.email).first()
-    if rider and verify_password(request.password, rider.password):
+    if rider and _password_matches(db, rider, request.password):
         return {"user_id": rider.id, "role": "rider"}
     
     agent = db.query(Agent).filter(Agent.email == request.email).first()
-    if agent and verify_password(request.password, agent.password):
+    if agent and _password_matches(db, agent, request.password):
         return {"user_id": agent.id, "role": "agent"}
     
     customer = db.query(Customer).filter(Customer.email == request.email).first()
-    if customer and verify_password(request.password, customer.password):
+    if customer and _password_matches(db, customer, request.password):
         return {"user_id": customer.id, "role": "customer"}
     
     return None
@@ -0,0 +1,265 @@
+import heapq
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Optional, List
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Rider
+from services.live_service import rider_feed
+
+EARTH_RADIUS_KM = 6371.0088
+# ~1.1 km of latitude per cell; Nairobi riders spread over a few hundred cells
+CELL_SIZE_DEGREES = 0.01
+RIDER_AVAILABILITY = {"available", "busy", "offline"}
+# Rings searched before nearest() falls back to scanning every rider (~55 km at the default cell size)
+MAX_SEARCH_RINGS = 50
+# Each worker reloads its grid this often, picking up changes other workers wrote
+RIDER_INDEX_REFRESH_SECONDS = float(os.getenv("RIDER_INDEX_REFRESH_SECONDS", "10"))
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+class RiderGrid:
+    """
+    In-memory uniform grid of available riders' last-known positions.
+    Updates are O(1); nearest() searches rings of cells outwards from the
+    pickup and stops once no unvisited cell can beat the k-th best distance.
+    The database stays the source of truth: each worker process keeps its
+    own copy, rebuilt on startup and every RIDER_INDEX_REFRESH_SECONDS.
+    """
+    def __init__(self, cell_size: float = CELL_SIZE_DEGREES):
+        self.cell_size = cell_size
+        self._positions = {}
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def _cell(self, lat: float, lon: float) -> tuple:
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size))
+
+    def __len__(self):
+        return len(self._positions)
+
+    def update(self, rider_id: int, lat: float, lon: float, available: bool = True):
+        """Record a rider's position; riders that are not available are dropped from the grid."""
+        with self._lock:
+            self._discard(rider_id)
+            if not available:
+                return
+            cell = self._cell(lat, lon)
+            self._positions[rider_id] = (lat, lon, cell)
+            self._cells.setdefault(cell, set()).add(rider_id)
+
+    def move(self, rider_id: int, lat: float, lon: float):
+        """Refresh the position of a rider already in the grid; others are ignored."""
+        with self._lock:
+            if rider_id not in self._positions:
+                return
+            self._discard(rider_id)
+            cell = self._cell(lat, lon)
+            self._positions[rider_id] = (lat, lon, cell)
+            self._cells.setdefault(cell, set()).add(rider_id)
+
+    def remove(self, rider_id: int):
+        with self._lock:
+            self._discard(rider_id)
+
+    def _discard(self, rider_id: int):
+        previous = self._positions.pop(rider_id, None)
+        if previous:
+            members = self._cells.get(previous[2])
+            members.discard(rider_id)
+            if not members:
+                del self._cells[previous[2]]
+
+    def clear(self):
+        with self._lock:
+            self._positions.clear()
+            self._cells.clear()
+
+    def replace(self, riders: List[tuple]):
+        """Swap in a fresh set of (rider_id, lat, lon) rows; readers see the old or the new grid, never an empty one."""
+        positions, cells = {}, {}
+        for rider_id, lat, lon in riders:
+            cell = self._cell(lat, lon)
+            positions[rider_id] = (lat, lon, cell)
+            cells.setdefault(cell, set()).add(rider_id)
+        with self._lock:
+            self._positions, self._cells = positions, cells
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_distance_km: Optional[float] = None) -> List[tuple]:
+        """
+        Return up to k (distance_km, rider_id, lat, lon) tuples, closest first.
+        Pickups far from every rider would need thousands of empty rings, so
+        after MAX_SEARCH_RINGS the search switches to one pass over all riders.
+        """
+        cx, cy = self._cell(lat, lon)
+        # Equirectangular distances: accurate to well under 1% at city scale and much cheaper than haversine
+        km_per_degree = math.pi / 180 * EARTH_RADIUS_KM
+        lon_scale = max(math.cos(math.radians(lat)), 0.01)
+        km_per_cell = self.cell_size * km_per_degree * lon_scale
+        with self._lock:
+            if not self._positions:
+                return []
+            best = []  # min-heap on -distance, so best[0] is the current k-th nearest
+            cells_left = len(self._cells)
+            ring = 0
+            while cells_left:
+                # Anything in this ring or beyond is at least (ring - 1) cells away
+                floor_km = max(ring - 1, 0) * km_per_cell
+                if max_distance_km is not None and floor_km > max_distance_km:
+                    break
+                if len(best) == k and floor_km > -best[0][0]:
+                    break
+                if ring > MAX_SEARCH_RINGS:
+                    best = self._scan(lat, lon, k, max_distance_km, lon_scale, km_per_degree)
+                    break
+                for cell in self._ring_cells(cx, cy, ring):
+                    members = self._cells.get(cell)
+                    if not members:
+                        continue
+                    cells_left -= 1
+                    for rider_id in members:
+                        r_lat, r_lon, _ = self._positions[rider_id]
+                        distance = math.hypot(r_lat - lat, (r_lon - lon) * lon_scale) * km_per_degree
+                        if max_distance_km is not None and distance > max_distance_km:
+                            continue
+                        item = (-distance, rider_id, r_lat, r_lon)
+                        if len(best) < k:
+                            heapq.heappush(best, item)
+                        elif item > best[0]:
+                            heapq.heapreplace(best, item)
+                ring += 1
+            return [(-d, rider_id, r_lat, r_lon) for d, rider_id, r_lat, r_lon in sorted(best, reverse=True)]
+
+    def _scan(self, lat: float, lon: float, k: int, max_distance_km: Optional[float],
+              lon_scale: float, km_per_degree: float) -> List[tuple]:
+        """Linear pass over every rider, in the same heap form nearest() builds; caller holds the lock."""
+        candidates = []
+        for rider_id, (r_lat, r_lon, _) in self._positions.items():
+            distance = math.hypot(r_lat - lat, (r_lon - lon) * lon_scale) * km_per_degree
+            if max_distance_km is None or distance <= max_distance_km:
+                candidates.append((-distance, rider_id, r_lat, r_lon))
+        return heapq.nlargest(k, candidates)
+
+    @staticmethod
+    def _ring_cells(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+rider_index = RiderGrid()
+
+def is_dispatchable(status: str, availability: str) -> bool:
+    return status == "active" and availability == "available"
+
+def rebuild_rider_index(db: Session) -> int:
+    """Load every dispatchable rider with a known position into the grid."""
+    rows = db.query(Rider.id, Rider.last_latitude, Rider.last_longitude).filter(
+        Rider.status == "active",
+        Rider.availability == "available",
+        Rider.last_latitude.isnot(None),
+        Rider.last_longitude.isnot(None),
+    ).all()
+    rider_index.replace(rows)
+    return len(rows)
+
+class RiderIndexRefresher:
+    """
+    Background worker that periodically reloads this worker's rider grid
+    from the database. Position and availability changes handled by other
+    workers therefore reach this worker's dispatch within one interval. A
+    stale candidate is never double-booked: dispatch claims riders with a
+    conditional UPDATE.
+    """
+    def __init__(self, interval: float = RIDER_INDEX_REFRESH_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rider-index-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(10)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with SessionLocal() as db:
+                    rebuild_rider_index(db)
+            except Exception as e:
+                print(f"Rider index refresh failed: {e}")
+
+rider_index_refresher = RiderIndexRefresher()
+
+def update_rider_position(db: Session, rider_id: int, latitude: float, longitude: float,
+                          availability: Optional[str] = None) -> Optional[dict]:
+    """
+    Store a rider's last-known position (and optionally availability) and refresh the grid.
+    Written as a plain UPDATE so position pings don't bump the rider's row version.
+    """
+    rider = db.query(Rider.status, Rider.availability).filter(Rider.id == rider_id).first()
+    if not rider:
+        return None
+    if availability is not None and availability not in RIDER_AVAILABILITY:
+        raise ValueError(f"Invalid availability: {availability}. Must be one of {sorted(RIDER_AVAILABILITY)}")
+    availability = availability or rider.availability
+    now = datetime.utcnow()
+    db.query(Rider).filter(Rider.id == rider_id).update({
+        Rider.last_latitude: latitude,
+        Rider.last_longitude: longitude,
+        Rider.last_seen_at: now,
+        Rider.availability: availability,
+    }, synchronize_session=False)
+    db.commit()
+    rider_index.update(rider_id, latitude, longitude, is_dispatchable(rider.status, availability))
+    rider_feed.publish(rider_id, lat=latitude, lon=longitude, availability=availability,
+                       ts=now.replace(tzinfo=timezone.utc).timestamp())
+    return {"rider_id": rider_id, "latitude": latitude, "longitude": longitude,
+            "availability": availability, "last_seen_at": now}
+
+def find_nearest_riders(latitude: float, longitude: float, k: int = 5,
+                        max_distance_km: Optional[float] = None) -> List[dict]:
+    return [
+        {"rider_id": rider_id, "distance_km": round(distance, 3), "latitude": lat, "longitude": lon}
+        for distance, rider_id, lat, lon in rider_index.nearest(latitude, longitude, k, max_distance_km)
+    ]
+
+def dispatch_nearest_rider(db: Session, latitude: float, longitude: float,
+                           max_distance_km: Optional[float] = None) -> Optional[dict]:
+    """
+    Reserve the nearest available rider by flipping them to busy.
+    The conditional UPDATE guards against another worker reserving the same rider.
+    """
+    for candidate in find_nearest_riders(latitude, longitude, 5, max_distance_km):
+        claimed = db.query(Rider).filter(
+            Rider.id == candidate["rider_id"],
+            Rider.status == "active",
+            Rider.availability == "available",
+        ).update({Rider.availability: "busy"}, synchronize_session=False)
+        db.commit()
+        rider_index.remove(candidate["rider_id"])
+        if claimed:
+            rider_feed.publish(candidate["rider_id"], availability="busy")
+            return candidate
+    return None
@@ -0,0 +1,563 @@
+import fcntl
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, List
+import numpy as np
+import orjson
+from sqlalchemy import func, literal, literal_column, and_, table, column, text, select, update, bindparam
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, Query
+from database import engine
+from models import Feedback, Customer, Agent, Rider
+from services.dispatch_service import EARTH_RADIUS_KM
+from schemas.admin_schema import FeedbackResponse
+from utils.serialization import schema_columns
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+# FTS5 table maintained by triggers on SQLite (see migration 0008)
+_feedback_fts = table("feedback_fts", column("rowid"))
+
+def apply_feedback_filters(query: Query, region: Optional[str] = None, date_start: Optional[datetime] = None,
+                           date_end: Optional[datetime] = None) -> Query:
+    """The region-prefix and date-range filters shared by feedback listing and search."""
+    if region:
+        query = query.filter(Feedback.region.ilike(f"{region}%"))
+    if date_start and date_end:
+        query = query.filter(Feedback.timestamp.between(date_start, date_end))
+    elif date_start:
+        query = query.filter(Feedback.timestamp >= date_start)
+    elif date_end:
+        query = query.filter(Feedback.timestamp <= date_end)
+    return query
+
+def parse_search_query(q: str) -> List[List[str]]:
+    """
+    Split a search string into required clauses: single words and "quoted phrases".
+    Punctuation is dropped so no engine's query operators can be injected.
+    Each clause is a list of lowercase words; more than one means a phrase,
+    which is also how hyphenated words like no-show are searched.
+    """
+    clauses = []
+    for phrase, word in _QUERY_TOKEN.findall(q):
+        words = _WORD.findall((phrase or word).lower())
+        if words:
+            clauses.append(words)
+    if not clauses:
+        raise ValueError("Search query has no searchable words")
+    return clauses
+
+def _full_text(db: Session, query: Query, clauses: List[List[str]]) -> tuple:
+    """Add the backend's full-text match to query; returns (query, relevance expression)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        required = " ".join(f'+"{" ".join(words)}"' if len(words) > 1 else f"+{words[0]}" for words in clauses)
+        natural = " ".join(word for words in clauses for word in words)
+        query = query.filter(match(Feedback.message, against=required).in_boolean_mode())
+        return query, match(Feedback.message, against=natural).in_natural_language_mode()
+    if dialect == "postgresql":
+        # Must match the indexed expression exactly, so the config is a literal, not a bound parameter
+        vector = func.to_tsvector(literal_column("'english'"), Feedback.message)
+        websearch = " ".join(f'"{" ".join(words)}"' if len(words) > 1 else words[0] for words in clauses)
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), websearch)
+        return query.filter(vector.op("@@")(tsquery)), func.ts_rank_cd(vector, tsquery)
+    if dialect == "sqlite":
+        fts_query = " ".join(f'"{" ".join(words)}"' for words in clauses)
+        query = query.join(_feedback_fts, _feedback_fts.c.rowid == Feedback.id).filter(
+            text("feedback_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+        # bm25() is lower for better matches
+        return query, -func.bm25(literal_column("feedback_fts"))
+    conditions = [Feedback.message.ilike(f"%{' '.join(words)}%") for words in clauses]
+    return query.filter(and_(*conditions)), literal(0.0)
+
+def search_feedbacks(db: Session, q: str, region: Optional[str] = None, date_start: Optional[datetime] = None,
+                     date_end: Optional[datetime] = None, limit: int = 50, offset: int = 0) -> list:
+    """
+    Full-text search over feedback messages, best matches first. Every word and
+    quoted phrase must appear; region and date filters narrow the matches.
+    Rows come back as tuples of the FeedbackResponse columns plus score.
+    """
+    clauses = parse_search_query(q)
+    query = db.query(Feedback.id)
+    query, score = _full_text(db, query, clauses)
+    query = apply_feedback_filters(query, region, date_start, date_end)
+    query = query.with_entities(*schema_columns(Feedback, FeedbackResponse), score.label("score"))
+    results = query.order_by(score.desc(), Feedback.timestamp.desc()).offset(offset).limit(limit).all()
+    print(f"search_feedbacks: {len(results)} matches for {clauses} with region filter: {region}")
+    return results
+
+FEEDBACK_CLASSIFY_INTERVAL_SECONDS = float(os.getenv("FEEDBACK_CLASSIFY_INTERVAL_SECONDS", "15"))
+FEEDBACK_CLASSIFY_BATCH_SIZE = int(os.getenv("FEEDBACK_CLASSIFY_BATCH_SIZE", "1000"))
+# Least weighted keyword evidence for a category; weaker messages stay "General"
+MIN_CATEGORY_SCORE = 0.75
+
+# Same taxonomy the dashboard filters on; "General" is the fallback
+FEEDBACK_CATEGORY_KEYWORDS = {
+    "Delivery": ["delivery", "late", "delay", "delayed", "slow", "wait", "waiting", "parcel", "package",
+                 "damaged", "broken", "lost", "missing", "address", "arrived", "hours"],
+    "Rider": ["rider", "rude", "polite", "friendly", "helmet", "speeding", "phone", "reach", "unprofessional",
+              "behaviour", "behavior", "attitude", "driver"],
+    "Payment": ["fee", "payment", "pay", "paid", "refund", "charged", "charge", "mpesa", "price", "expensive",
+                "money", "cost", "overcharged", "receipt"],
+    "Station": ["station", "agent", "closed", "queue", "open", "opening", "counter", "branch"],
+}
+URGENT_KEYWORDS = ["accident", "stolen", "theft", "fraud", "harassed", "harassment", "threatened", "threat",
+                   "injured", "injury", "police", "emergency", "assault", "unsafe", "crash"]
+
+# Approximate centres of the delivery regions, for placing riders by their last position
+REGION_CENTROIDS = {
+    "Westlands": (-1.2676, 36.8108),
+    "Embakasi": (-1.3146, 36.8990),
+    "Kasarani": (-1.2210, 36.8970),
+    "Lang'ata": (-1.3500, 36.7600),
+    "Dagoretti": (-1.2900, 36.7300),
+    "Starehe": (-1.2833, 36.8333),
+    "Kamukunji": (-1.2800, 36.8500),
+    "Makadara": (-1.2970, 36.8680),
+    "Ruaraka": (-1.2480, 36.8760),
+    "Mathare": (-1.2600, 36.8580),
+}
+MAX_REGION_DISTANCE_KM = 8.0
+_REGION_MENTION = re.compile(
+    "|".join(re.escape(name).replace("'", "'?") for name in REGION_CENTROIDS), re.IGNORECASE)
+_REGION_BY_KEY = {name.lower().replace("'", ""): name for name in REGION_CENTROIDS}
+
+def _word_forms(word: str) -> tuple:
+    return (word, word + "s", word + "es", word + "ed", word + "d", word + "ing")
+
+class KeywordTfidfModel:
+    """
+    Scores messages against keyword lists with TF-IDF weights, a chunk at a time.
+    Each chunk becomes a sparse-by-construction count matrix (messages x keywords);
+    log term frequency times inverse document frequency, learned from every
+    message seen so far, is projected onto the categories with one matrix
+    product. Keywords shared by several categories count for each in proportion.
+    """
+    def __init__(self, category_keywords: dict = FEEDBACK_CATEGORY_KEYWORDS, urgent_keywords: list = URGENT_KEYWORDS):
+        self.categories = list(category_keywords)
+        vocabulary = list(dict.fromkeys([w for words in category_keywords.values() for w in words] + urgent_keywords))
+        self._index = {}
+        for position, word in enumerate(vocabulary):
+            for form in _word_forms(word):
+                self._index.setdefault(form, position)
+        weights = np.zeros((len(vocabulary), len(self.categories)))
+        for column_index, words in enumerate(category_keywords.values()):
+            for word in words:
+                weights[vocabulary.index(word), column_index] = 1.0
+        shared = weights.sum(axis=1, keepdims=True)
+        self.weights = np.divide(weights, shared, out=np.zeros_like(weights), where=shared > 0)
+        self.urgent = np.zeros(len(vocabulary), dtype=bool)
+        self.urgent[[vocabulary.index(word) for word in urgent_keywords]] = True
+        self.document_frequency = np.zeros(len(vocabulary))
+        self.documents = 0
+
+    def counts(self, messages: List[str]) -> np.ndarray:
+        rows, columns = [], []
+        for row, message in enumerate(messages):
+            for word in _WORD.findall(message.lower()):
+                position = self._index.get(word)
+                if position is not None:
+                    rows.append(row)
+                    columns.append(position)
+        counts = np.zeros((len(messages), len(self.urgent)))
+        np.add.at(counts, (rows, columns), 1.0)
+        return counts
+
+    def classify(self, messages: List[str]) -> tuple:
+        """Return (categories, urgency flags) for a chunk of messages."""
+        counts = self.counts(messages)
+        self.document_frequency += (counts > 0).sum(axis=0)
+        self.documents += len(messages)
+        idf = np.log((1 + self.documents) / (1 + self.document_frequency)) + 1
+        scores = (np.log1p(counts) * idf) @ self.weights
+        best = scores.argmax(axis=1)
+        confident = scores[np.arange(len(messages)), best] >= MIN_CATEGORY_SCORE
+        categories = [self.categories[b] if ok else "General" for b, ok in zip(best, confident)]
+        urgent = (counts[:, self.urgent] > 0).any(axis=1)
+        return categories, urgent.tolist()
+
+def region_mentioned(text_value: Optional[str]) -> Optional[str]:
+    if not text_value:
+        return None
+    found = _REGION_MENTION.search(text_value)
+    return _REGION_BY_KEY[found.group(0).lower().replace("'", "")] if found else None
+
+def nearest_regions(positions: np.ndarray) -> List[Optional[str]]:
+    """Closest region centre to each (lat, lon) row, or None when none is within MAX_REGION_DISTANCE_KM."""
+    if not len(positions):
+        return []
+    names = list(REGION_CENTROIDS)
+    centres = np.array(list(REGION_CENTROIDS.values()))
+    km_per_degree = np.pi / 180 * EARTH_RADIUS_KM
+    dlat = positions[:, None, 0] - centres[None, :, 0]
+    dlon = (positions[:, None, 1] - centres[None, :, 1]) * np.cos(np.radians(centres[:, 0]))[None, :]
+    distances = np.hypot(dlat, dlon) * km_per_degree
+    best = distances.argmin(axis=1)
+    return [names[b] if distances[i, b] <= MAX_REGION_DISTANCE_KM else None for i, b in enumerate(best)]
+
+def _submitter_regions(conn, rows) -> dict:
+    """Infer regions for submitters: customer address, agent station, or rider's last position."""
+    ids_by_type = {}
+    for row in rows:
+        ids_by_type.setdefault(row.user_type, set()).add(row.user_id)
+    regions = {}
+    if ids_by_type.get("customer"):
+        for user_id, address in conn.execute(
+                select(Customer.id, Customer.address).where(Customer.id.in_(ids_by_type["customer"]))):
+            regions[("customer", user_id)] = region_mentioned(address)
+    if ids_by_type.get("agent"):
+        for user_id, station in conn.execute(
+                select(Agent.id, Agent.station_location).where(Agent.id.in_(ids_by_type["agent"]))):
+            regions[("agent", user_id)] = region_mentioned(station)
+    if ids_by_type.get("rider"):
+        located = conn.execute(select(Rider.id, Rider.last_latitude, Rider.last_longitude).where(
+            Rider.id.in_(ids_by_type["rider"]), Rider.last_latitude.isnot(None), Rider.last_longitude.isnot(None))).all()
+        positions = np.array([(lat, lon) for _, lat, lon in located], dtype=float).reshape(-1, 2)
+        for (user_id, _, _), region in zip(located, nearest_regions(positions)):
+            regions[("rider", user_id)] = region
+    return regions
+
+class FeedbackClassifier:
+    """
+    Background worker that classifies new feedback in chunks, off the submit path.
+    Each pass takes up to batch_size unclassified rows (oldest first), assigns
+    category and urgency with the keyword TF-IDF model, fills in region where it
+    is still "Unknown" (a region named in the message, else the submitter's),
+    and writes everything back with one executemany UPDATE per chunk.
+    Categories other than the default "General" are never overwritten.
+    """
+    def __init__(self, interval: float = FEEDBACK_CLASSIFY_INTERVAL_SECONDS, batch_size: int = FEEDBACK_CLASSIFY_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.model = KeywordTfidfModel()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="feedback-classifier", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(10)
+        self._thread = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                while not self._stop.is_set() and self.classify_batch() == self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"Feedback classifier: pass failed: {e}")
+
+    def classify_batch(self) -> int:
+        """Classify one chunk of unclassified feedback; returns how many rows it took."""
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(Feedback.id, Feedback.message, Feedback.user_id, Feedback.user_type,
+                       Feedback.region, Feedback.category)
+                .where(Feedback.classified_at.is_(None))
+                .order_by(Feedback.classified_at, Feedback.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return 0
+            categories, urgent = self.model.classify([row.message for row in rows])
+            submitter_regions = _submitter_regions(conn, [row for row in rows if row.region in ("Unknown", "")])
+            now = datetime.utcnow()
+            updates = []
+            for row, category, is_urgent in zip(rows, categories, urgent):
+                region = row.region
+                if region in ("Unknown", ""):
+                    region = (region_mentioned(row.message)
+                              or submitter_regions.get((row.user_type, row.user_id)) or region)
+                updates.append({
+                    "feedback_id": row.id,
+                    "new_category": category if row.category == "General" else row.category,
+                    "new_urgency": is_urgent,
+                    "new_region": region,
+                    "classified": now,
+                })
+            conn.execute(
+                update(Feedback.__table__)
+                .where(Feedback.__table__.c.id == bindparam("feedback_id"))
+                .values(category=bindparam("new_category"), urgency=bindparam("new_urgency"),
+                        region=bindparam("new_region"), classified_at=bindparam("classified")),
+                updates,
+            )
+        print(f"Feedback classifier: classified {len(rows)} feedback rows")
+        return len(rows)
+
+feedback_classifier = FeedbackClassifier()
+
+# Buffered (write-behind) intake for feedback submissions; off by default
+FEEDBACK_BUFFERED = os.getenv("FEEDBACK_BUFFERED", "false").lower() in ("1", "true", "yes")
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "500"))
+FEEDBACK_MAX_LATENCY_SECONDS = float(os.getenv("FEEDBACK_MAX_LATENCY_MS", "1000")) / 1000
+FEEDBACK_MAX_PENDING = int(os.getenv("FEEDBACK_MAX_PENDING", "20000"))
+FEEDBACK_SPILL_DIR = os.getenv("FEEDBACK_SPILL_DIR", "spill")
+# fsync every submission; without it a spilled line survives a worker crash but not a host crash
+FEEDBACK_SPILL_FSYNC = os.getenv("FEEDBACK_SPILL_FSYNC", "false").lower() in ("1", "true", "yes")
+# Rows per spill segment; a segment is deleted once all of its rows have committed
+FEEDBACK_SPILL_SEGMENT_ROWS = int(os.getenv("FEEDBACK_SPILL_SEGMENT_ROWS", "1000"))
+FEEDBACK_RETRY_SECONDS = 2.0
+
+def build_feedback_row(user_id: int, user_type: str, message: str) -> dict:
+    """A new feedback row as submitted; the classifier fills in region, category and urgency later."""
+    return {
+        "user_id": user_id,
+        "user_type": user_type,
+        "message": message,
+        "region": "Unknown",
+        "category": "General",
+        "status": "Pending",
+        "rating": 0,
+        "timestamp": datetime.utcnow(),
+    }
+
+def _encode_spill(row: dict) -> bytes:
+    return orjson.dumps(row) + b"\n"
+
+def _decode_spill(line: bytes) -> Optional[dict]:
+    try:
+        row = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None  # torn final line from a crash mid-write; it was never acknowledged
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+def insert_feedback_rows(conn, rows: List[dict]) -> int:
+    """Multi-row INSERT of feedback rows, skipping submission_ids already stored. Returns rows inserted."""
+    existing = set(conn.execute(select(Feedback.submission_id).where(
+        Feedback.submission_id.in_([row["submission_id"] for row in rows]))).scalars())
+    fresh = []
+    for row in rows:
+        if row["submission_id"] not in existing:
+            existing.add(row["submission_id"])
+            fresh.append(row)
+    if fresh:
+        conn.execute(Feedback.__table__.insert(), fresh)
+    return len(fresh)
+
+class _SpillSegment:
+    """One append-only spill file and how many of its rows have been spilled and committed."""
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "ab")
+        fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.spilled = 0
+        self.committed = 0
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.path)
+
+class FeedbackIngestor:
+    """
+    Write-behind intake for feedback. submit() appends the row to this
+    worker's current spill segment, queues it and returns its submission_id
+    right away; a writer thread inserts queued rows with one multi-row INSERT
+    per batch (batch_size rows or max_latency after the oldest). Segments
+    rotate every segment_rows rows and are deleted once every row in them
+    has committed, so under sustained load the spill directory only holds
+    acknowledged-but-unwritten feedback plus at most one partly committed
+    segment. Each worker holds an exclusive lock on its open segments; on
+    start, segments no live worker holds are replayed, and submission_id
+    keeps a replay from inserting a row twice. While the database is
+    unavailable batches are retried, and once the queue is full submit()
+    raises queue.Full.
+    """
+    def __init__(self, enabled: bool = FEEDBACK_BUFFERED, batch_size: int = FEEDBACK_BATCH_SIZE,
+                 max_latency: float = FEEDBACK_MAX_LATENCY_SECONDS, max_pending: int = FEEDBACK_MAX_PENDING,
+                 spill_dir: str = FEEDBACK_SPILL_DIR, segment_rows: int = FEEDBACK_SPILL_SEGMENT_ROWS):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.spill_dir = spill_dir
+        self.segment_rows = segment_rows
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._running = False
+        self._segments = []  # open segments, oldest first; the last one takes new rows
+        self._segment_prefix = None
+        self._segment_count = 0
+
+    def start(self):
+        """Start the writer when buffering is enabled; spill files left behind are replayed either way."""
+        if not self.enabled:
+            self.recover()
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._segment_prefix = f"feedback-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="feedback-ingestor", daemon=True)
+            self._thread.start()
+        self.recover()
+
+    def stop(self, timeout: float = 10):
+        """Flush everything already accepted, then stop the writer thread and release the spill segments."""
+        with self._lock:
+            if not self._thread:
+                return
+            self._running = False
+            self._stopping.set()
+            self._queue.put(None)
+            thread, self._thread = self._thread, None
+        thread.join(timeout)
+        with self._lock:
+            for segment in self._segments:
+                if segment.committed >= segment.spilled:
+                    segment.discard()
+                else:
+                    segment.file.close()  # unlocked; the next start replays it
+            self._segments = []
+
+    def _current_segment(self) -> _SpillSegment:
+        if not self._segments or self._segments[-1].spilled >= self.segment_rows:
+            self._segment_count += 1
+            name = f"{self._segment_prefix}-{self._segment_count:06d}.jsonl"
+            self._segments.append(_SpillSegment(os.path.join(self.spill_dir, name)))
+        return self._segments[-1]
+
+    def submit(self, row: dict) -> str:
+        """Accept one feedback row for writing; returns its submission_id."""
+        row = {**row, "submission_id": uuid.uuid4().hex}
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Feedback ingestor is not running")
+            if self._queue.full():
+                raise queue.Full
+            segment = self._current_segment()
+            segment.file.write(_encode_spill(row))
+            segment.file.flush()
+            if FEEDBACK_SPILL_FSYNC:
+                os.fsync(segment.file.fileno())
+            segment.spilled += 1
+            self._queue.put_nowait((row, segment))
+        return row["submission_id"]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._write_all(self._drain())
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if stopping:
+                self._write_all(batch + self._drain())
+                return
+            self._write(batch)
+
+    def _drain(self) -> List[tuple]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not None:
+                items.append(item)
+
+    def _write_all(self, items: List[tuple]):
+        for start in range(0, len(items), self.batch_size):
+            if not self._write(items[start:start + self.batch_size]):
+                return
+
+    def _write(self, batch: List[tuple]) -> bool:
+        """Insert one batch, retrying until it commits; gives up only when stopping (the spill segments keep it)."""
+        rows = [row for row, _ in batch]
+        while True:
+            try:
+                with engine.begin() as conn:
+                    inserted = insert_feedback_rows(conn, rows)
+                break
+            except Exception as e:
+                print(f"Feedback ingestor: batch of {len(batch)} failed: {e}")
+                if self._stopping.wait(FEEDBACK_RETRY_SECONDS):
+                    return False
+        with self._lock:
+            for _, segment in batch:
+                segment.committed += 1
+            # Drop segments that are fully committed and no longer taking rows
+            current = self._segments[-1] if self._segments else None
+            keep = []
+            for segment in self._segments:
+                sealed = segment is not current or segment.spilled >= self.segment_rows
+                if sealed and segment.committed >= segment.spilled:
+                    segment.discard()
+                else:
+                    keep.append(segment)
+            self._segments = keep
+        print(f"Feedback ingestor: inserted {inserted} feedback rows")
+        feedback_classifier.wake()
+        return True
+
+    def recover(self) -> int:
+        """Replay spill segments left by workers that exited with feedback still unwritten."""
+        if not os.path.isdir(self.spill_dir):
+            return 0
+        with self._lock:
+            own = {os.path.abspath(segment.path) for segment in self._segments}
+        recovered = 0
+        for name in sorted(os.listdir(self.spill_dir)):
+            path = os.path.join(self.spill_dir, name)
+            if not (name.startswith("feedback-") and name.endswith(".jsonl")) or os.path.abspath(path) in own:
+                continue
+            with open(path, "rb") as spill:
+                try:
+                    fcntl.flock(spill, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # a live worker's segment
+                rows = [row for row in map(_decode_spill, spill) if row]
+                try:
+                    with engine.begin() as conn:
+                        for start in range(0, len(rows), self.batch_size):
+                            recovered += insert_feedback_rows(conn, rows[start:start + self.batch_size])
+                except Exception as e:
+                    print(f"Feedback ingestor: could not replay {path}: {e}")
+                    continue
+                os.remove(path)
+        if recovered:
+            print(f"Feedback ingestor: recovered {recovered} feedback rows from spill files")
+            feedback_classifier.wake()
+        return recovered
+
+feedback_ingestor = FeedbackIngestor()
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import event, select, delete, update
+from sqlalchemy.orm import Session
+from database import engine
+from models import Admin, Rider, PendingFileDeletion
+
+FILE_GC_INTERVAL_SECONDS = float(os.getenv("FILE_GC_INTERVAL_SECONDS", "30"))
+FILE_ORPHAN_SCAN_SECONDS = float(os.getenv("FILE_ORPHAN_SCAN_SECONDS", "3600"))
+# Uploads are written before their row commits; younger files are never treated as orphans
+FILE_ORPHAN_GRACE_SECONDS = float(os.getenv("FILE_ORPHAN_GRACE_SECONDS", "3600"))
+FILE_GC_MAX_ATTEMPTS = 5
+FILE_GC_BATCH_SIZE = 500
+
+# Upload directories and the file names in them that uploads produce; anything else is left alone
+MANAGED_DIRECTORIES = (
+    ("static/uploads/riders", re.compile(r".+\.pdf$")),
+    ("static/images", re.compile(r"^admin-\d+-\d+\.\w+$")),
+)
+FILE_REFERENCES = (Rider.id_document, Rider.driving_license, Rider.insurance, Admin.profile_picture)
+
+def schedule_file_deletion(db: Session, *paths: Optional[str]):
+    """
+    Queue stored uploads (by their /static URL) for removal in db's current
+    transaction. Files are only removed after that transaction commits, so a
+    rollback keeps both the row that points at them and the files.
+    """
+    rows = [PendingFileDeletion(path=path, requested_at=datetime.utcnow()) for path in paths if path]
+    if not rows:
+        return
+    db.add_all(rows)
+    if not db.info.get("file_gc_pending"):
+        db.info["file_gc_pending"] = True
+        event.listen(db, "after_commit", _wake_collector, once=True)
+    print(f"Scheduled {len(rows)} files for deletion after commit")
+
+def _wake_collector(session: Session):
+    session.info.pop("file_gc_pending", None)
+    file_collector.wake()
+
+def referenced_paths(conn, paths: Optional[Iterable[str]] = None) -> set:
+    """Upload URLs still stored on a rider or admin, optionally limited to the given ones."""
+    paths = list(paths) if paths is not None else None
+    referenced = set()
+    for column in FILE_REFERENCES:
+        query = select(column).where(column.in_(paths)) if paths is not None else select(column).where(column.isnot(None))
+        referenced.update(conn.execute(query).scalars())
+    return referenced
+
+class FileCollector:
+    """
+    Background worker that removes queued uploads after commit and, less often,
+    reconciles the upload directories against the database: files no row
+    references (and older than the grace period) are removed, and rows that
+    point at missing files are reported. A queued path that is still
+    referenced elsewhere (documents can be shared) is dropped from the queue
+    without touching the file.
+    """
+    def __init__(self, interval: float = FILE_GC_INTERVAL_SECONDS, orphan_scan_interval: float = FILE_ORPHAN_SCAN_SECONDS):
+        self.interval = interval
+        self.orphan_scan_interval = orphan_scan_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._next_scan = time.monotonic() + orphan_scan_interval
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(10)
+        self._thread = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.collect()
+                if time.monotonic() >= self._next_scan:
+                    self._next_scan = time.monotonic() + self.orphan_scan_interval
+                    self.scan_orphans()
+            except Exception as e:
+                print(f"File collector: pass failed: {e}")
+
+    def collect(self) -> int:
+        """Remove queued files whose transaction has committed; returns how many files were removed."""
+        removed = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    select(PendingFileDeletion.id, PendingFileDeletion.path)
+                    .where(PendingFileDeletion.attempts < FILE_GC_MAX_ATTEMPTS)
+                    .order_by(PendingFileDeletion.id)
+                    .limit(FILE_GC_BATCH_SIZE)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if not rows:
+                    return removed
+                still_used = referenced_paths(conn, {path for _, path in rows})
+                done, failed = [], []
+                for row_id, path in rows:
+                    if path not in still_used:
+                        try:
+                            file_path = path.lstrip("/")
+                            if os.path.exists(file_path):
+                                os.remove(file_path)
+                                removed += 1
+                                print(f"Deleted file: {file_path}")
+                        except OSError as e:
+                            print(f"Error deleting file {path}: {e}")
+                            failed.append(row_id)
+                            continue
+                    done.append(row_id)
+                if done:
+                    conn.execute(delete(PendingFileDeletion).where(PendingFileDeletion.id.in_(done)))
+                if failed:
+                    conn.execute(update(PendingFileDeletion).where(PendingFileDeletion.id.in_(failed))
+                                 .values(attempts=PendingFileDeletion.attempts + 1))
+            if len(rows) < FILE_GC_BATCH_SIZE:
+                return removed
+
+    def scan_orphans(self, grace_seconds: float = FILE_ORPHAN_GRACE_SECONDS) -> dict:
+        """Reconcile upload directories with stored references; returns counts of what was found."""
+        with engine.connect() as conn:
+            referenced = referenced_paths(conn)
+        cutoff = time.time() - grace_seconds
+        orphans = 0
+        present = set()
+        for directory, pattern in MANAGED_DIRECTORIES:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not pattern.match(entry.name):
+                        continue
+                    url = f"/{directory}/{entry.name}"
+                    present.add(url)
+                    if url in referenced or entry.stat().st_mtime > cutoff:
+                        continue
+                    try:
+                        os.remove(entry.path)
+                        orphans += 1
+                        print(f"Deleted orphaned file: {entry.path}")
+                    except OSError as e:
+                        print(f"Error deleting orphaned file {entry.path}: {e}")
+        managed = tuple(f"/{directory}/" for directory, _ in MANAGED_DIRECTORIES)
+        dangling = [path for path in referenced if path.startswith(managed) and path not in present]
+        if dangling:
+            print(f"File collector: {len(dangling)} stored references point at missing files, e.g. {dangling[:5]}")
+        print(f"File collector: orphan scan removed {orphans} files")
+        return {"orphans_removed": orphans, "dangling_references": len(dangling)}
+
+file_collector = FileCollector()
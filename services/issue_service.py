@@ -0,0 +1,61 @@
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from models import Issue
+from utils.cache import LRUCache
+
+# A repeat of an open issue within this long of its last occurrence is counted on it instead of inserted
+ISSUE_COALESCE_WINDOW_SECONDS = float(os.getenv("ISSUE_COALESCE_WINDOW_SECONDS", "900"))
+ISSUE_COALESCE_MAX_FINGERPRINTS = int(os.getenv("ISSUE_COALESCE_MAX_FINGERPRINTS", "4096"))
+
+# Ids, counts, timestamps and hex tokens vary between repeats of the same failure
+_VOLATILE = re.compile(r"\b(?:[0-9a-f]{8,}|[0-9a-f-]{36}|\d+(?:[.:/-]\d+)*)\b", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+# fingerprint -> (issue id, last_seen) of the open issue it coalesces onto
+recent_issues = LRUCache(ISSUE_COALESCE_MAX_FINGERPRINTS)
+
+def issue_fingerprint(description: str, *flags: bool) -> str:
+    """Stable key for 'the same issue': the description with volatile tokens masked, plus the flags."""
+    normalized = _SPACE.sub(" ", _VOLATILE.sub("#", description.lower())).strip()
+    key = normalized + "|" + "".join("1" if flag else "0" for flag in flags)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def coalesce_issue(db: Session, fingerprint: str, now: datetime) -> Optional[int]:
+    """
+    Count another occurrence on the open issue with this fingerprint if it was
+    last seen within the window; returns its id, or None when a new issue is
+    needed. Fingerprints recently seen by this worker skip the lookup and go
+    straight to a guarded UPDATE; the table stays authoritative, so issues
+    closed or seen by another worker are handled correctly.
+    """
+    cutoff = now - timedelta(seconds=ISSUE_COALESCE_WINDOW_SECONDS)
+    cached = recent_issues.get(fingerprint)
+    if cached and cached[1] >= cutoff:
+        issue_id = cached[0]
+    else:
+        row = db.query(Issue.id).filter(
+            Issue.fingerprint == fingerprint,
+            Issue.status == "open",
+            Issue.last_seen >= cutoff,
+        ).order_by(Issue.last_seen.desc()).first()
+        if not row:
+            recent_issues.pop(fingerprint)
+            return None
+        issue_id = row.id
+    updated = db.query(Issue).filter(
+        Issue.id == issue_id,
+        Issue.status == "open",
+        Issue.last_seen >= cutoff,
+    ).update({Issue.occurrences: Issue.occurrences + 1, Issue.last_seen: now}, synchronize_session=False)
+    if not updated:
+        recent_issues.pop(fingerprint)
+        return None
+    recent_issues.put(fingerprint, (issue_id, now))
+    return issue_id
+
+def remember_issue(issue: Issue):
+    recent_issues.put(issue.fingerprint, (issue.id, issue.last_seen))
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import threading
+from datetime import timezone
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple, Optional, List
+import orjson
+from sqlalchemy.orm import Session
+from models import Rider
+
+LIVE_TICK_SECONDS = float(os.getenv("LIVE_TICK_MS", "500")) / 1000
+# Riders a slow dashboard may have queued before further riders are dropped until it catches up
+LIVE_MAX_CLIENT_BACKLOG = int(os.getenv("LIVE_MAX_CLIENT_BACKLOG", "5000"))
+
+class Viewport(NamedTuple):
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+    def contains(self, lat: float, lon: float) -> bool:
+        return self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon
+
+def parse_viewport(values) -> Optional[Viewport]:
+    """Build a Viewport from [min_lat, min_lon, max_lat, max_lon]; None means everything."""
+    if values is None:
+        return None
+    if len(values) != 4:
+        raise ValueError("viewport must be [min_lat, min_lon, max_lat, max_lon]")
+    viewport = Viewport(*(float(v) for v in values))
+    if viewport.min_lat > viewport.max_lat or viewport.min_lon > viewport.max_lon:
+        raise ValueError("viewport minimums must not exceed maximums")
+    return viewport
+
+def _frame(fragments) -> str:
+    return (b'{"type":"riders","riders":[' + b",".join(fragments) + b"]}").decode()
+
+def _removal(rider_id: int) -> bytes:
+    return orjson.dumps({"id": rider_id, "removed": True})
+
+class LiveSubscriber:
+    """
+    One dashboard connection. Its mailbox holds at most one pending update
+    per rider, so while a send is in flight newer positions overwrite older
+    ones instead of queueing behind them.
+    """
+    def __init__(self, viewport: Optional[Viewport] = None):
+        self.viewport = viewport
+        self.visible = set()
+        self.dropped = 0
+        self.closed = False
+        self._mailbox = {}
+        self._wakeup = asyncio.Event()
+
+    def offer(self, rider_id: int, fragment: bytes):
+        if rider_id in self._mailbox:
+            self.dropped += 1
+        elif len(self._mailbox) >= LIVE_MAX_CLIENT_BACKLOG:
+            self.dropped += 1
+            return
+        self._mailbox[rider_id] = fragment
+        self._wakeup.set()
+
+    def prime(self, states: List[dict]):
+        """Queue a snapshot of riders the dashboard should start with."""
+        for state in states:
+            if self.viewport is None or self.viewport.contains(state["lat"], state["lon"]):
+                self.offer(state["id"], orjson.dumps(state))
+                self.visible.add(state["id"])
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    async def next_frame(self) -> Optional[str]:
+        """Wait for pending updates and return them as one JSON text frame; None once closed."""
+        while not self.closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._mailbox:
+                mailbox, self._mailbox = self._mailbox, {}
+                return _frame(mailbox.values())
+        return None
+
+class RiderFeed:
+    """
+    Fans rider position and availability changes out to subscribed dashboards.
+    publish() may be called from any thread and only merges into the rider's
+    latest state; once per tick the changed riders are serialized once each,
+    sorted by latitude, and each subscriber takes its viewport slice with a
+    bisect. Riders that leave a viewport are sent as {"id": .., "removed": true}.
+    The feed is per worker process: a dashboard sees changes handled by the
+    worker it is connected to.
+    """
+    def __init__(self, tick: float = LIVE_TICK_SECONDS):
+        self.tick_seconds = tick
+        self._state = {}
+        self._dirty = set()
+        self._removed = set()
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._task = None
+
+    def publish(self, rider_id: int, **fields):
+        with self._lock:
+            state = self._state.setdefault(rider_id, {"id": rider_id})
+            state.update(fields)
+            self._dirty.add(rider_id)
+            self._removed.discard(rider_id)
+
+    def remove(self, rider_id: int):
+        with self._lock:
+            self._state.pop(rider_id, None)
+            self._dirty.discard(rider_id)
+            self._removed.add(rider_id)
+
+    def latest(self, rider_id: int) -> Optional[dict]:
+        with self._lock:
+            state = self._state.get(rider_id)
+            return dict(state) if state else None
+
+    def subscribe(self, viewport: Optional[Viewport] = None) -> LiveSubscriber:
+        subscriber = LiveSubscriber(viewport)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LiveSubscriber):
+        subscriber.close()
+        self._subscribers.discard(subscriber)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriber in list(self._subscribers):
+            self.unsubscribe(subscriber)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Rider feed tick failed: {e}")
+
+    def tick(self):
+        with self._lock:
+            changed = [dict(self._state[rider_id]) for rider_id in self._dirty]
+            removed = self._removed
+            self._dirty, self._removed = set(), set()
+        if not self._subscribers or not (changed or removed):
+            return
+
+        placed, unplaced = [], []
+        for state in changed:
+            fragment = orjson.dumps(state)
+            if state.get("lat") is None or state.get("lon") is None:
+                unplaced.append((state["id"], fragment))
+            else:
+                placed.append((state["lat"], state["lon"], state["id"], fragment))
+        placed.sort()
+        latitudes = [item[0] for item in placed]
+        changed_ids = {state["id"] for state in changed}
+
+        for subscriber in self._subscribers:
+            viewport = subscriber.viewport
+            if viewport is None:
+                in_view = placed
+            else:
+                lo = bisect_left(latitudes, viewport.min_lat)
+                hi = bisect_right(latitudes, viewport.max_lat)
+                in_view = [item for item in placed[lo:hi] if viewport.min_lon <= item[1] <= viewport.max_lon]
+            now_visible = set()
+            for _, _, rider_id, fragment in in_view:
+                subscriber.offer(rider_id, fragment)
+                now_visible.add(rider_id)
+            # Availability-only changes go to dashboards already showing the rider
+            for rider_id, fragment in unplaced:
+                if rider_id in subscriber.visible:
+                    subscriber.offer(rider_id, fragment)
+                    now_visible.add(rider_id)
+            gone = ((subscriber.visible & changed_ids) - now_visible) | (subscriber.visible & removed)
+            for rider_id in gone:
+                subscriber.offer(rider_id, _removal(rider_id))
+            subscriber.visible -= gone
+            subscriber.visible |= now_visible
+
+rider_feed = RiderFeed()
+
+def load_snapshot(db: Session, viewport: Optional[Viewport] = None) -> List[dict]:
+    """Current state of every active rider with a known position inside the viewport."""
+    query = db.query(Rider.id, Rider.last_latitude, Rider.last_longitude, Rider.availability,
+                     Rider.last_seen_at).filter(
+        Rider.status == "active",
+        Rider.last_latitude.isnot(None),
+        Rider.last_longitude.isnot(None),
+    )
+    if viewport:
+        query = query.filter(
+            Rider.last_latitude.between(viewport.min_lat, viewport.max_lat),
+            Rider.last_longitude.between(viewport.min_lon, viewport.max_lon),
+        )
+    rows = []
+    for rider_id, lat, lon, availability, last_seen_at in query.all():
+        state = {"id": rider_id, "lat": lat, "lon": lon, "availability": availability,
+                 "ts": last_seen_at.replace(tzinfo=timezone.utc).timestamp() if last_seen_at else None}
+        # Positions this worker has seen but not yet flushed are newer than the table
+        state.update(rider_feed.latest(rider_id) or {})
+        rows.append(state)
+    return rows
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Optional, List
+from sqlalchemy import bindparam, or_, select, update
+from database import engine
+from models import Rider, RiderLocation
+from services.dispatch_service import rider_index
+from services.live_service import rider_feed
+
+LOCATION_FLUSH_SECONDS = float(os.getenv("LOCATION_FLUSH_SECONDS", "5"))
+# Points stamped further than this into the future are rejected as clock skew
+MAX_CLOCK_SKEW_SECONDS = 120
+# Trail points held while the database is unreachable; the oldest are dropped beyond this
+MAX_BUFFERED_POINTS = int(os.getenv("LOCATION_MAX_BUFFERED_POINTS", "200000"))
+
+def to_epoch(moment: datetime) -> float:
+    """Epoch seconds for a naive-UTC or timezone-aware datetime."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+class LatestPositionStore:
+    """
+    Latest known position per rider in three parallel float arrays indexed
+    by rider id (24 bytes per rider), instead of a dict of per-rider dicts.
+    A timestamp of 0 marks a slot with no position yet.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.latitudes = array("d", bytes(8 * capacity))
+        self.longitudes = array("d", bytes(8 * capacity))
+        self.timestamps = array("d", bytes(8 * capacity))
+        self._lock = threading.Lock()
+
+    def _ensure(self, rider_id: int):
+        size = len(self.timestamps)
+        if rider_id >= size:
+            grow = max(rider_id + 1, size * 2) - size
+            padding = bytes(8 * grow)
+            self.latitudes.frombytes(padding)
+            self.longitudes.frombytes(padding)
+            self.timestamps.frombytes(padding)
+
+    def record(self, rider_id: int, latitude: float, longitude: float, timestamp: float) -> bool:
+        """Store a position if it is newer than the one held; returns whether it was stored."""
+        with self._lock:
+            self._ensure(rider_id)
+            if timestamp <= self.timestamps[rider_id]:
+                return False
+            self.latitudes[rider_id] = latitude
+            self.longitudes[rider_id] = longitude
+            self.timestamps[rider_id] = timestamp
+            return True
+
+    def get(self, rider_id: int) -> Optional[tuple]:
+        """(latitude, longitude, epoch seconds) or None if the rider hasn't reported."""
+        if rider_id >= len(self.timestamps) or not self.timestamps[rider_id]:
+            return None
+        return self.latitudes[rider_id], self.longitudes[rider_id], self.timestamps[rider_id]
+
+class LocationIngestor:
+    """
+    Accepts batches of GPS points: each point is a memory write into the
+    latest-position store plus an append to the trail buffer. A background
+    thread flushes the buffer every flush_interval with one multi-row INSERT
+    into rider_locations and one executemany UPDATE of riders' last position.
+    """
+    def __init__(self, flush_interval: float = LOCATION_FLUSH_SECONDS):
+        self.flush_interval = flush_interval
+        self.latest = LatestPositionStore()
+        self._trail = []
+        self._dirty = set()
+        self._buffer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="location-ingestor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(self.flush_interval + 10)
+        self._thread = None
+        self.flush()
+
+    def ingest(self, rider_id: int, points: List[tuple]) -> int:
+        """Take (latitude, longitude, recorded_at) points; returns how many were accepted."""
+        horizon = time.time() + MAX_CLOCK_SKEW_SECONDS
+        trail = []
+        newest = None
+        for latitude, longitude, recorded_at in points:
+            timestamp = to_epoch(recorded_at)
+            if timestamp > horizon:
+                continue
+            trail.append({
+                "rider_id": rider_id,
+                "latitude": latitude,
+                "longitude": longitude,
+                "recorded_at": datetime.utcfromtimestamp(timestamp),
+            })
+            if newest is None or timestamp > newest[2]:
+                newest = (latitude, longitude, timestamp)
+        if newest and self.latest.record(rider_id, *newest):
+            rider_index.move(rider_id, newest[0], newest[1])
+            rider_feed.publish(rider_id, lat=newest[0], lon=newest[1], ts=newest[2])
+            with self._buffer_lock:
+                self._dirty.add(rider_id)
+        with self._buffer_lock:
+            self._trail.extend(trail)
+        return len(trail)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._buffer_lock:
+            trail, self._trail = self._trail, []
+            dirty, self._dirty = self._dirty, set()
+        if not trail and not dirty:
+            return
+        try:
+            with engine.begin() as conn:
+                rider_ids = dirty | {row["rider_id"] for row in trail}
+                known = set(conn.execute(select(Rider.id).where(Rider.id.in_(rider_ids))).scalars())
+                trail = [row for row in trail if row["rider_id"] in known]
+                positions = self._positions(dirty & known)
+                if trail:
+                    conn.execute(RiderLocation.__table__.insert(), trail)
+                if positions:
+                    conn.execute(
+                        update(Rider.__table__)
+                        .where(Rider.__table__.c.id == bindparam("rider_key"))
+                        # Never roll back a newer position stored by PUT /rider/location or another worker
+                        .where(or_(Rider.__table__.c.last_seen_at.is_(None),
+                                   Rider.__table__.c.last_seen_at < bindparam("seen")))
+                        .values(last_latitude=bindparam("lat"), last_longitude=bindparam("lon"),
+                                last_seen_at=bindparam("seen")),
+                        positions,
+                    )
+            print(f"Location ingestor: wrote {len(trail)} trail points, {len(positions)} rider positions")
+        except Exception as e:
+            # Put the work back so the next tick retries it
+            print(f"Location ingestor: flush failed, retrying next tick: {e}")
+            with self._buffer_lock:
+                self._trail[:0] = trail
+                if len(self._trail) > MAX_BUFFERED_POINTS:
+                    del self._trail[:len(self._trail) - MAX_BUFFERED_POINTS]
+                self._dirty |= dirty
+
+    def _positions(self, rider_ids: set) -> List[dict]:
+        positions = []
+        for rider_id in rider_ids:
+            latitude, longitude, timestamp = self.latest.get(rider_id)
+            positions.append({
+                "rider_key": rider_id,
+                "lat": latitude,
+                "lon": longitude,
+                "seen": datetime.utcfromtimestamp(timestamp),
+            })
+        return positions
+
+location_ingestor = LocationIngestor()
@@ -0,0 +1,195 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import engine
+from models import Order, Customer, Agent, Rider
+
+# Status lifecycle: each status lists the statuses it may move to
+ORDER_TRANSITIONS = {
+    "pending": {"assigned", "cancelled"},
+    "assigned": {"picked_up", "pending", "cancelled"},
+    "picked_up": {"in_transit", "delivered"},
+    "in_transit": {"delivered"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+ORDER_BATCH_SIZE = int(os.getenv("ORDER_BATCH_SIZE", "500"))
+ORDER_MAX_LATENCY_SECONDS = float(os.getenv("ORDER_MAX_LATENCY_MS", "50")) / 1000
+ORDER_MAX_PENDING = int(os.getenv("ORDER_MAX_PENDING", "20000"))
+
+class OrderIngestor:
+    """
+    Buffers order submissions in a bounded in-memory queue and writes them
+    with one multi-row INSERT per batch. A batch is flushed when it reaches
+    batch_size or when its oldest order has waited max_latency, so a caller
+    waits at most about max_latency plus one INSERT. Each submission gets a
+    Future resolved with the stored order (or the reason it was rejected).
+    """
+    def __init__(self, batch_size: int = ORDER_BATCH_SIZE, max_latency: float = ORDER_MAX_LATENCY_SECONDS,
+                 max_pending: int = ORDER_MAX_PENDING):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="order-ingestor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Flush everything already accepted, then stop the writer thread."""
+        with self._lock:
+            if not self._thread:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, row: dict) -> Future:
+        """Queue one order row; raises queue.Full when the buffer is saturated."""
+        self.start()
+        future = Future()
+        self._queue.put_nowait((row, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                self._drain()
+                return
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._flush(batch[start:start + self.batch_size])
+
+    def _flush(self, batch: List[tuple]):
+        # Callers that time out cancel their future; once running it can't be cancelled, and the order is still written
+        for _, future in batch:
+            future.set_running_or_notify_cancel()
+        rejected, accepted = [], []
+        try:
+            with engine.begin() as conn:
+                customer_ids = {row["customer_id"] for row, _ in batch}
+                agent_ids = {row["agent_id"] for row, _ in batch if row.get("agent_id") is not None}
+                known_customers = set(conn.execute(
+                    select(Customer.id).where(Customer.id.in_(customer_ids))).scalars())
+                known_agents = set(conn.execute(
+                    select(Agent.id).where(Agent.id.in_(agent_ids))).scalars()) if agent_ids else set()
+
+                for row, future in batch:
+                    if row["customer_id"] not in known_customers:
+                        rejected.append((future, ValueError("Customer not found")))
+                    elif row.get("agent_id") is not None and row["agent_id"] not in known_agents:
+                        rejected.append((future, ValueError(f"Agent station {row['agent_id']} not found")))
+                    else:
+                        accepted.append((row, future))
+                if accepted:
+                    conn.execute(Order.__table__.insert(), [row for row, _ in accepted])
+        except Exception as e:
+            print(f"Order ingestor: batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                _notify(future, error=e)
+            return
+        # Only after the commit, and outside the failure path, so a notification problem can't misreport the batch
+        for future, error in rejected:
+            _notify(future, error=error)
+        for row, future in accepted:
+            _notify(future, result=row)
+        if accepted:
+            print(f"Order ingestor: inserted {len(accepted)} orders ({len(rejected)} rejected)")
+
+def _notify(future: Future, result=None, error: Optional[Exception] = None):
+    if future.cancelled() or future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+order_ingestor = OrderIngestor()
+
+def build_order_row(customer_id: int, order_data: dict) -> dict:
+    """Complete a validated order payload into an insertable row."""
+    return {
+        **order_data,
+        "reference": uuid.uuid4().hex,
+        "customer_id": customer_id,
+        "status": "pending",
+        "created_at": datetime.utcnow(),
+    }
+
+def get_customer_orders(db: Session, customer_id: int, before: Optional[datetime] = None, limit: int = 20):
+    """Newest-first order history for a customer, served by ix_orders_customer_created."""
+    query = db.query(Order).filter(Order.customer_id == customer_id)
+    if before:
+        query = query.filter(Order.created_at < before)
+    return query.order_by(Order.created_at.desc()).limit(limit).all()
+
+def get_rider_orders(db: Session, rider_id: int, status: Optional[str] = None):
+    """A rider's work queue, served by ix_orders_rider_status."""
+    query = db.query(Order).filter(Order.rider_id == rider_id)
+    if status:
+        query = query.filter(Order.status == status)
+    else:
+        query = query.filter(Order.status.in_(["assigned", "picked_up", "in_transit"]))
+    return query.order_by(Order.created_at).all()
+
+def update_order_status(db: Session, reference: str, status: str, rider_id: Optional[int] = None) -> Optional[Order]:
+    """Move an order along its lifecycle; assigning requires a rider."""
+    order = db.query(Order).filter(Order.reference == reference).first()
+    if not order:
+        return None
+    if status not in ORDER_TRANSITIONS:
+        raise ValueError(f"Invalid status: {status}")
+    if status not in ORDER_TRANSITIONS[order.status]:
+        raise ValueError(f"Cannot move order from '{order.status}' to '{status}'")
+    if status == "assigned":
+        rider_id = rider_id or order.rider_id
+        if not rider_id or not db.query(Rider.id).filter(Rider.id == rider_id).first():
+            raise ValueError("A valid rider_id is required to assign an order")
+        order.rider_id = rider_id
+    elif status == "pending":
+        order.rider_id = None
+    order.status = status
+    db.commit()
+    db.refresh(order)
+    return order
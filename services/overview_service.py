@@ -0,0 +1,61 @@
+import asyncio
+import os
+from fastapi.concurrency import run_in_threadpool
+from database import ReadSessionLocal
+from models import Admin
+from schemas.admin_schema import (
+    AdminProfileResponse,
+    AdminPreferencesResponse,
+    IssueListAdapter,
+    TopRegionListAdapter,
+)
+from services.admin_service import get_urgent_issues, get_non_urgent_issues, get_top_regions, get_admin_preferences
+from utils.cache import TTLCache
+
+# Sections shared by every admin are cached briefly; per-admin sections come from the principal
+OVERVIEW_CACHE_SECONDS = float(os.getenv("OVERVIEW_CACHE_SECONDS", "5"))
+overview_cache = TTLCache(OVERVIEW_CACHE_SECONDS)
+
+def _issues_section(query):
+    def load():
+        with ReadSessionLocal() as db:
+            return IssueListAdapter.dump_python(
+                IssueListAdapter.validate_python(query(db), from_attributes=True), mode="json")
+    return load
+
+def _top_regions_section():
+    return TopRegionListAdapter.dump_python(TopRegionListAdapter.validate_python(get_top_regions(None)), mode="json")
+
+SHARED_SECTIONS = {
+    "priorities": _issues_section(get_urgent_issues),
+    "notifications": _issues_section(get_non_urgent_issues),
+    "top_regions": _top_regions_section,
+}
+
+async def build_admin_overview(admin: Admin) -> dict:
+    """
+    Everything the admin landing page needs in one payload. Shared sections
+    load concurrently, each on its own read session, and are served from
+    overview_cache while fresh. A section that fails is returned as null and
+    listed under 'unavailable' so the rest of the page still renders.
+    """
+    names = list(SHARED_SECTIONS)
+    results = await asyncio.gather(
+        *(run_in_threadpool(overview_cache.get_or_load, name, SHARED_SECTIONS[name]) for name in names),
+        return_exceptions=True,
+    )
+    overview = {
+        "dashboard": {"message": f"Welcome to Admin Dashboard, {admin.id}"},
+        "profile": AdminProfileResponse.model_validate(admin).model_dump(mode="json"),
+        "preferences": AdminPreferencesResponse.model_validate(get_admin_preferences(admin)).model_dump(mode="json"),
+    }
+    unavailable = []
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"Admin overview: section {name} failed: {result}")
+            overview[name] = None
+            unavailable.append(name)
+        else:
+            overview[name] = result
+    overview["unavailable"] = unavailable
+    return overview
@@ -1,4 +1,7 @@
-from fastapi import Request, HTTPException
+from fastapi import Request, HTTPException, Depends
+from sqlalchemy.orm import Session, defer
+from database import get_db
+from models import Admin
 
 def get_current_user(request: Request):
     print(f"Request cookies: {request.cookies}")  # Add this
@@ -15,4 +18,18 @@ def get_current_user(request: Request):
         print(f"Authenticated user: user_id={user_id}, role={role}")  # Add this
         return {"user_id": user_id, "role": role}
     except (ValueError, IndexError):
-        raise HTTPException(status_code=401, detail="Invalid session")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid session")
+
+def get_current_admin(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)) -> Admin:
+    """
+    Resolve the authenticated admin row once per request.
+    FastAPI caches this dependency for the request, and the row sits in the
+    request's session identity map, so handlers and services share it
+    instead of querying Admin again. The password hash is deferred.
+    """
+    if current_user["role"] not in ["admin", "super_admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    admin = db.query(Admin).options(defer(Admin.password)).filter(Admin.id == current_user["user_id"]).first()
+    if not admin:
+        raise HTTPException(status_code=404, detail="Admin not found")
+    return admin
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire after ttl seconds.
+    Concurrent misses on the same key wait for a single load instead of
+    each running the loader. Each worker process keeps its own entries.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have loaded it while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+            value = loader()
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one entry, or every entry when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+class LRUCache:
+    """
+    Thread-safe mapping that holds at most maxsize entries, evicting the
+    least recently used one. Per worker process, like TTLCache.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,124 @@
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+# Media that is already compressed; recompressing it only burns CPU
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "application/pdf", "application/zip",
+                        "application/gzip", "application/x-gzip", "font/woff")
+
+def choose_encoding(accept_encoding: str, brotli_enabled: bool):
+    """Pick br or gzip from an Accept-Encoding header by q-value, preferring br on ties."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    candidates = (["br"] if brotli_enabled else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compress a chunk; flush=True forces it out so streamed clients see it immediately."""
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that gzip/brotli-compresses responses the client accepts.
+    Whole bodies smaller than minimum_size are sent as-is; streamed bodies are
+    compressed chunk by chunk. Excluded path prefixes and already-compressed
+    content types pass through untouched.
+    """
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 exclude_paths: tuple = ("/static/images",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), brotli is not None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or content_type.startswith(INCOMPRESSIBLE_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                else:
+                    body = encoder.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            if more_body:
+                chunk = encoder.compress(body, flush=True)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
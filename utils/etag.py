@@ -0,0 +1,41 @@
+import hashlib
+import re
+from typing import Optional
+from fastapi import HTTPException, Response
+
+_ETAG = re.compile(r'^"(?P<kind>[a-z-]+)-(?P<id>\d+)-v(?P<version>\d+)(?:-[0-9a-f]+)?"$')
+
+def make_etag(kind: str, object_id: int, version: int, variant: Optional[tuple] = None) -> str:
+    """
+    Strong ETag for one representation of a versioned row, e.g. "rider-12-v3".
+    Sparse fieldsets get a short digest suffix so each representation has its own tag.
+    """
+    etag = f"{kind}-{object_id}-v{version}"
+    if variant:
+        etag += "-" + hashlib.sha1(",".join(variant).encode()).hexdigest()[:8]
+    return f'"{etag}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header already names this representation."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+def if_match_version(if_match: Optional[str], kind: str, object_id: int) -> Optional[int]:
+    """
+    Version the client expects to overwrite, taken from an If-Match header.
+    Returns None when there is no precondition (header absent or "*"); fails
+    with 412 when the tag is malformed or belongs to another resource.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    match = _ETAG.match(if_match.strip())
+    if not match or match.group("kind") != kind or int(match.group("id")) != object_id:
+        raise HTTPException(status_code=412, detail="If-Match does not match this resource")
+    return int(match.group("version"))
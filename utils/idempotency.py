@@ -0,0 +1,245 @@
+import hashlib
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from database import engine
+from models import IdempotencyKey
+
+# POST endpoints whose retries are answered from the stored first response
+IDEMPOTENT_PATHS = ("/admin/register-rider", "/admin/feedback", "/auth/register")
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# A first request still unfinished after this long is assumed lost (worker killed) and may be retried
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "300"))
+# Larger responses are not stored; a retry then runs the handler again
+IDEMPOTENCY_MAX_BODY_BYTES = 64 * 1024
+MAX_KEY_LENGTH = 255
+# Request bodies are fingerprinted as they stream in and spooled for the handler; larger ones get 413
+IDEMPOTENCY_MAX_REQUEST_BYTES = int(os.getenv("IDEMPOTENCY_MAX_REQUEST_BYTES", str(32 * 1024 * 1024)))
+# Spooled bodies move from memory to a temporary file past this size
+SPOOL_MEMORY_BYTES = 1024 * 1024
+REPLAY_CHUNK_BYTES = 64 * 1024
+
+_next_purge = 0.0
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(len(part).to_bytes(8, "big"))
+        hasher.update(part)
+    return hasher.hexdigest()[:32]
+
+def _session_cookie(headers: Headers) -> bytes:
+    for part in headers.get("cookie", "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == "session":
+            return value.encode()
+    return b""
+
+class RequestFingerprint:
+    """
+    Incremental digest of a request body; multipart boundaries are left out
+    since clients pick a new one per attempt. The last len(boundary) - 1
+    bytes are held back so a boundary split across chunks is still removed.
+    """
+    def __init__(self, content_type: str):
+        media_type, _, params = content_type.partition(";")
+        media_type = media_type.strip().lower().encode()
+        self.boundary = b""
+        if media_type == b"multipart/form-data":
+            for param in params.split(";"):
+                name, _, value = param.strip().partition("=")
+                if name.lower() == "boundary" and value:
+                    self.boundary = value.strip('"').encode()
+        self.hasher = hashlib.sha256()
+        self.hasher.update(len(media_type).to_bytes(8, "big"))
+        self.hasher.update(media_type)
+        self.pending = b""
+
+    def update(self, chunk: bytes):
+        data = self.pending + chunk
+        if self.boundary:
+            data = data.replace(self.boundary, b"")
+            split = max(len(data) - len(self.boundary) + 1, 0)
+            data, self.pending = data[:split], data[split:]
+        self.hasher.update(data)
+
+    def hexdigest(self) -> str:
+        self.hasher.update(self.pending)
+        self.pending = b""
+        return self.hasher.hexdigest()[:32]
+
+def claim_key(key_hash: str, fingerprint: str):
+    """
+    Record that a request with this key is starting. Returns None when this
+    caller should run the handler, or the stored IdempotencyKey row (finished
+    or still in flight) when an earlier request holds the key.
+    """
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        existing = conn.execute(select(IdempotencyKey.__table__).where(IdempotencyKey.key_hash == key_hash)).first()
+        if existing is not None:
+            abandoned = existing.status_code is None and existing.created_at < now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+            if existing.expires_at > now and not abandoned:
+                return existing
+            conn.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash == key_hash))
+    try:
+        with engine.begin() as conn:
+            conn.execute(IdempotencyKey.__table__.insert().values(
+                key_hash=key_hash, fingerprint=fingerprint, created_at=now,
+                expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)))
+    except IntegrityError:
+        # A concurrent retry claimed it between our read and insert
+        with engine.connect() as conn:
+            return conn.execute(select(IdempotencyKey.__table__).where(IdempotencyKey.key_hash == key_hash)).first()
+    return None
+
+def store_response(key_hash: str, status_code: int, content_type: Optional[str], body: bytes):
+    with engine.begin() as conn:
+        conn.execute(update(IdempotencyKey).where(IdempotencyKey.key_hash == key_hash)
+                     .values(status_code=status_code, content_type=content_type, body=body))
+
+def release_key(key_hash: str):
+    """Forget an unfinished claim so a retry runs the handler again."""
+    with engine.begin() as conn:
+        conn.execute(delete(IdempotencyKey).where(IdempotencyKey.key_hash == key_hash,
+                                                  IdempotencyKey.status_code.is_(None)))
+
+def purge_expired():
+    """Delete expired keys, at most once per IDEMPOTENCY_PURGE_SECONDS per worker."""
+    global _next_purge
+    if time.monotonic() < _next_purge:
+        return
+    _next_purge = time.monotonic() + IDEMPOTENCY_PURGE_SECONDS
+    with engine.begin() as conn:
+        removed = conn.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow())).rowcount
+    if removed:
+        print(f"Idempotency: purged {removed} expired keys")
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware for POST requests that carry an Idempotency-Key header on
+    the configured paths. The first request runs normally and its response
+    (status, content type, body) is stored for the TTL; retries with the same
+    key from the same caller get that response back without running the
+    handler again, marked with Idempotent-Replayed: true. Keys are scoped to
+    the session cookie and path, and only digests of the key and the request
+    body are stored. Reusing a key for a different body is rejected with 422;
+    a retry while the first request is still running gets 409. 5xx responses
+    are not stored, so those retries run again. The request body is hashed
+    as it arrives and spooled (to disk once large) for the handler; bodies
+    over IDEMPOTENCY_MAX_REQUEST_BYTES are rejected with 413.
+    """
+    def __init__(self, app, paths: tuple = IDEMPOTENT_PATHS):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse({"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"},
+                               status_code=400)(scope, receive, send)
+            return
+
+        try:
+            declared_length = int(headers.get("content-length", "0"))
+        except ValueError:
+            declared_length = 0
+        if declared_length > IDEMPOTENCY_MAX_REQUEST_BYTES:
+            await self._too_large(scope, receive, send)
+            return
+
+        fingerprint = RequestFingerprint(headers.get("content-type", ""))
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        try:
+            received = 0
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                if received > IDEMPOTENCY_MAX_REQUEST_BYTES:
+                    await self._too_large(scope, receive, send)
+                    return
+                fingerprint.update(chunk)
+                spool.write(chunk)
+                if not message.get("more_body", False):
+                    break
+            spool.seek(0)
+            await self._run_once(scope, receive, send, headers, key, fingerprint.hexdigest(), spool)
+        finally:
+            spool.close()
+
+    async def _too_large(self, scope, receive, send):
+        await JSONResponse({"detail": f"Request body exceeds {IDEMPOTENCY_MAX_REQUEST_BYTES} bytes"},
+                           status_code=413)(scope, receive, send)
+
+    async def _run_once(self, scope, receive, send, headers: Headers, key: str, fingerprint: str, spool):
+        key_hash = _digest(_session_cookie(headers), scope["path"].encode(), key.encode())
+
+        await run_in_threadpool(purge_expired)
+        stored = await run_in_threadpool(claim_key, key_hash, fingerprint)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                response = JSONResponse({"detail": "Idempotency-Key was already used for a different request"},
+                                        status_code=422)
+            elif stored.status_code is None:
+                response = JSONResponse({"detail": "A request with this Idempotency-Key is still being processed"},
+                                        status_code=409, headers={"Retry-After": "1"})
+            else:
+                response = Response(stored.body, status_code=stored.status_code, media_type=stored.content_type,
+                                    headers={"Idempotent-Replayed": "true"})
+            await response(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            chunk = spool.read(REPLAY_CHUNK_BYTES)
+            body_sent = len(chunk) < REPLAY_CHUNK_BYTES
+            return {"type": "http.request", "body": chunk, "more_body": not body_sent}
+
+        status_code = None
+        content_type = None
+        response_body = []
+        response_size = 0
+
+        async def capture(message):
+            nonlocal status_code, content_type, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                response_size += len(chunk)
+                if response_size <= IDEMPOTENCY_MAX_BODY_BYTES:
+                    response_body.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await run_in_threadpool(release_key, key_hash)
+            raise
+        if status_code is None or status_code >= 500 or response_size > IDEMPOTENCY_MAX_BODY_BYTES:
+            await run_in_threadpool(release_key, key_hash)
+        else:
+            await run_in_threadpool(store_response, key_hash, status_code, content_type, b"".join(response_body))
@@ -1,19 +1,85 @@
 from fastapi import Response
 from passlib.context import CryptContext
+from typing import Optional, Tuple
+import os
 import secrets
 import string
 
+try:
+    import argon2  # noqa: F401  (argon2-cffi; optional, only needed for PASSWORD_SCHEME=argon2)
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+# Hashing cost is tuned per deployment; run `python calibrate_hashing.py` on the target host
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_KIB = int(os.getenv("ARGON2_MEMORY_KIB", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+def build_password_context(scheme: str = PASSWORD_SCHEME, bcrypt_rounds: int = BCRYPT_ROUNDS,
+                           argon2_time_cost: int = ARGON2_TIME_COST, argon2_memory_kib: int = ARGON2_MEMORY_KIB,
+                           argon2_parallelism: int = ARGON2_PARALLELISM) -> CryptContext:
+    """
+    Context that hashes with `scheme` at the given cost and still verifies
+    hashes from the other scheme. Hashes in another scheme or at any other
+    cost (higher or lower) report needs_update, so they are replaced at next
+    login; passlib already compares argon2 memory_cost exactly.
+    """
+    if scheme not in ("bcrypt", "argon2"):
+        raise ValueError(f"Unsupported PASSWORD_SCHEME: {scheme}")
+    if scheme == "argon2" and not ARGON2_AVAILABLE:
+        raise RuntimeError("PASSWORD_SCHEME=argon2 requires the argon2-cffi package")
+    schemes = [scheme] + [other for other in ("bcrypt", "argon2") if other != scheme and (other != "argon2" or ARGON2_AVAILABLE)]
+    settings = {
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "bcrypt__max_rounds": bcrypt_rounds,
+    }
+    if ARGON2_AVAILABLE:
+        settings.update({
+            "argon2__time_cost": argon2_time_cost,
+            "argon2__min_rounds": argon2_time_cost,
+            "argon2__max_rounds": argon2_time_cost,
+            "argon2__memory_cost": argon2_memory_kib,
+            "argon2__parallelism": argon2_parallelism,
+        })
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **settings)
+
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_password_context()
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
+    """Hash a password with the configured scheme and cost."""
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify if a plain password matches the hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; when it matches but its hash uses an outdated scheme
+    or cost, also return a replacement hash for the caller to store.
+    """
+    matches, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if matches and new_hash is None and _argon2_parallelism(hashed_password) not in (None, ARGON2_PARALLELISM):
+        # passlib's needs_update ignores argon2 parallelism
+        new_hash = pwd_context.hash(plain_password)
+    return matches, new_hash
+
+def _argon2_parallelism(hashed_password: str) -> Optional[int]:
+    """The p= parameter of an argon2 hash ($argon2id$v=19$m=..,t=..,p=..$...), or None for other schemes."""
+    if not hashed_password.startswith("$argon2"):
+        return None
+    for part in hashed_password.split("$"):
+        for param in part.split(","):
+            name, _, value = param.partition("=")
+            if name == "p" and value.isdigit():
+                return int(value)
+    return None
+
 def create_session(response: Response, user_id: int, role: str):
     """Create a session cookie for the user."""
     session_data = f"{user_id}|{role}"
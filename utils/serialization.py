@@ -0,0 +1,25 @@
+from typing import Any
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: encodes dicts/lists with orjson instead of the stdlib encoder."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def schema_columns(model, schema: type[BaseModel]) -> list:
+    """Model columns backing a response schema's fields, for row-tuple queries."""
+    return [getattr(model, name) for name in schema.model_fields if hasattr(model, name)]
+
+def adapter_response(adapter: TypeAdapter, data: Any) -> Response:
+    """
+    Validate ORM objects or row tuples once with a prebuilt adapter and write
+    the JSON bytes straight from pydantic-core, skipping FastAPI's second
+    response_model validation and the jsonable_encoder walk.
+    """
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        media_type="application/json",
+    )
@@ -0,0 +1,93 @@
+import os
+import time
+from database import SessionLocal, engine, replica_engines
+from models import Admin, Rider, Feedback, Issue
+from schemas.admin_schema import (
+    AdminProfileResponse,
+    RiderResponse,
+    PaginatedRiderResponse,
+    FeedbackResponse,
+    IssueResponse,
+    PaginatedRiderAdapter,
+)
+from utils.serialization import adapter_response
+from services.admin_service import get_riders
+from utils.security import pwd_context
+
+# Connections opened per engine before a worker reports ready
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "5"))
+
+_preloaded = False
+_ready = False
+
+def is_ready() -> bool:
+    return _ready
+
+def preload():
+    """
+    Process-wide warmup that is safe to run before forking workers:
+    loads the passlib bcrypt backend and exercises the pydantic
+    validators/serializers used by the hot list responses.
+    """
+    global _preloaded
+    if _preloaded:
+        return
+    started = time.perf_counter()
+    pwd_context.dummy_verify()
+
+    rider = {
+        "id": 0, "name": "Warm Up", "email": "warmup@dropu.co.ke", "phone_number": "0700000000",
+        "bike_number": "KAA000A", "bike_model": "-", "bike_color": "-", "license": "-",
+        "id_document": "-", "driving_license": "-", "insurance": "-", "emergency_contact_name": "-",
+        "emergency_contact_phone": "-", "emergency_contact_relationship": "-", "created_by": 0,
+        "status": "active", "created_at": "2025-01-01T00:00:00",
+    }
+    PaginatedRiderResponse.model_validate({"total": 1, "skip": 0, "limit": 10, "riders": [rider]}).model_dump_json()
+    RiderResponse.model_validate(rider).model_dump_json()
+    _preloaded = True
+    print(f"Preloaded process in {time.perf_counter() - started:.3f}s")
+
+def _prime_pool(target_engine):
+    """Open WARMUP_CONNECTIONS connections at once so the pool is full before traffic arrives."""
+    connections = []
+    try:
+        for _ in range(WARMUP_CONNECTIONS):
+            connections.append(target_engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+def warm_worker():
+    """
+    Per-worker warmup, run after fork: fills the connection pools and runs
+    the main admin queries once so SQLAlchemy's compiled statement cache
+    and the ORM-to-schema serialization path are hot. Sets readiness.
+    """
+    global _ready
+    preload()
+    started = time.perf_counter()
+    _prime_pool(engine)
+    for replica in replica_engines:
+        try:
+            _prime_pool(replica)
+        except Exception as e:
+            print(f"Skipping replica warmup: {e}")
+
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin).filter(Admin.id == 0).first()
+        db.query(Admin).filter(Admin.email == "").first()
+        db.query(Rider).filter(Rider.email == "").first()
+        db.query(Rider).filter(Rider.id == 0).first()
+        riders = get_riders(db, None, 0, 10)
+        adapter_response(PaginatedRiderAdapter, {"total": riders["total"], "skip": 0, "limit": 10, "riders": riders["riders"]})
+        feedbacks = db.query(Feedback).order_by(Feedback.timestamp.desc()).limit(10).all()
+        [FeedbackResponse.model_validate(f).model_dump_json() for f in feedbacks]
+        issues = db.query(Issue).filter(Issue.urgency == True).limit(10).all()
+        [IssueResponse.model_validate(i).model_dump_json() for i in issues]
+        if admin:
+            AdminProfileResponse.model_validate(admin).model_dump_json()
+    finally:
+        db.close()
+    _ready = True
+    print(f"Worker {os.getpid()} warmed up in {time.perf_counter() - started:.3f}s")